@@ -0,0 +1,234 @@
+"""
+Rendering benchmark for main.Video.
+
+Generates synthetic scripts of different sizes and mixes, renders each one
+with `manim` at the requested qualities and records frames/second, seconds
+per section and peak memory (from render_metrics) to
+benchmarks/results-<commit>.json. Diff two result files to see whether a
+change to main.py or a manim upgrade made rendering faster or slower.
+
+Every render runs in a fresh temporary directory, so the voiceover, mobject
+and stinger caches start cold and runs are comparable. Voiceovers come from
+the stub TTS backend (silent clips of the expected length), so no network is
+needed and TTS latency does not add noise.
+
+Usage:
+    uv run benchmark.py -q l m h
+    uv run benchmark.py --only code-small quiz-heavy -q l
+    uv run benchmark.py --compare benchmarks/results-abc1234.json benchmarks/results-def5678.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_voice import TTS_BACKEND_ENV
+from render_metrics import METRICS_FILE_ENV, read_events, summarize
+
+RESULTS_DIR = "benchmarks"
+MAIN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# name -> (section mix, number of sections, lines per snippet)
+BENCHMARKS = {
+    "code-small": ("code", 4, 5),
+    "code-large": ("code", 12, 10),
+    "quiz-heavy": ("quiz", 12, 0),
+    "real-world": ("real_world", 6, 8),
+    "mixed": ("mixed", 12, 7),
+}
+
+SECTION_MIXES = {
+    "code": ["code"],
+    "quiz": ["quiz", "quiz", "quiz", "code"],
+    "real_world": ["real_world"],
+    "mixed": ["code", "quiz", "real_world"],
+}
+
+
+def synthetic_snippet(index: int, lines: int) -> str:
+    body = [f"def step_{index}(values):", f"    # Step {index} of the synthetic tutorial"]
+    for line in range(max(lines - 3, 0)):
+        body.append(f"    values = [value * {line + 2} for value in values if value > {line}]")
+    body.append("    return values")
+    return "\n".join(body)
+
+
+def synthetic_script(mix: str, sections: int, lines: int) -> dict:
+    """A script shaped like a real one, with deterministic content."""
+    kinds = SECTION_MIXES[mix]
+    script_sections = []
+    for index in range(sections):
+        kind = kinds[index % len(kinds)]
+        if kind == "quiz":
+            script_sections.append(
+                {
+                    "type": "quiz",
+                    "question": f"What does step {index} return for an empty list?",
+                    "answer": f"An empty list, step {index} filters nothing",
+                }
+            )
+        elif kind == "real_world":
+            script_sections.append(
+                {
+                    "type": "real_world",
+                    "description": f"Step {index} cleans sensor readings in a data pipeline",
+                    "code_string": synthetic_snippet(index, lines),
+                }
+            )
+        else:
+            script_sections.append(
+                {
+                    "type": "code",
+                    "code_string": synthetic_snippet(index, lines),
+                    "annotation": f"Step {index} scales and filters values",
+                    "highlight_lines": [1, 2],
+                    "explanation": f"Step {index} keeps values above a threshold and scales the rest",
+                }
+            )
+    return {
+        "intro": "Benchmarking synthetic tutorial rendering",
+        "sections": script_sections,
+        "outro": "Thanks for benchmarking this tutorial",
+    }
+
+
+def git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(MAIN_FILE),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def manim_version() -> str:
+    try:
+        import manim
+
+        return manim.__version__
+    except ImportError:
+        return "unknown"
+
+
+def run_benchmark(name: str, quality: str) -> dict:
+    """Renders one synthetic script from scratch and returns its measurements."""
+    mix, sections, lines = BENCHMARKS[name]
+    with tempfile.TemporaryDirectory(prefix=f"benchmark-{name}-") as work_dir:
+        script_file = os.path.join(work_dir, f"{name}.json")
+        with open(script_file, "w") as f:
+            json.dump(synthetic_script(mix, sections, lines), f, indent=2)
+        metrics_file = os.path.join(work_dir, "metrics.jsonl")
+        log_file = os.path.join(work_dir, "manim.log")
+
+        command = [sys.executable, "-m", "manim", f"-q{quality}", MAIN_FILE, "Video", "-o", f"{name}.mp4"]
+        env = {
+            **os.environ,
+            "MANIM_SCRIPT_FILE": script_file,
+            METRICS_FILE_ENV: metrics_file,
+            TTS_BACKEND_ENV: "stub",
+        }
+        started = time.perf_counter()
+        with open(log_file, "w", encoding="utf-8") as log:
+            result = subprocess.run(command, cwd=work_dir, stdout=log, stderr=subprocess.STDOUT, env=env)
+        wall_seconds = time.perf_counter() - started
+
+        if result.returncode != 0 or not os.path.exists(metrics_file):
+            with open(log_file, "r", encoding="utf-8") as log:
+                tail = log.read()[-2000:]
+            print(f"{name} at -q{quality} failed:\n{tail}")
+            return {"benchmark": name, "quality": quality, "failed": True, "wall_seconds": wall_seconds}
+
+        summary = summarize([metrics_file])
+        sections_seconds = [
+            event["seconds"]
+            for event in read_events([metrics_file])
+            if event["event"] == "part" and event["part"].startswith("section-")
+        ]
+        return {
+            "benchmark": name,
+            "quality": quality,
+            "sections": sections,
+            "wall_seconds": wall_seconds,
+            "render_seconds": summary["render_seconds"],
+            "frames": summary["frames"],
+            "frames_per_second": summary["frames_per_second"],
+            "seconds_per_section": sum(sections_seconds) / len(sections_seconds) if sections_seconds else 0.0,
+            "stage_seconds": summary["stage_seconds"],
+            "peak_rss_mb": summary["peak_rss_mb"],
+        }
+
+
+def run_benchmarks(names: list[str], qualities: list[str]) -> dict:
+    results = []
+    for quality in qualities:
+        for name in names:
+            print(f"Benchmarking {name} at -q{quality}...")
+            result = run_benchmark(name, quality)
+            if not result.get("failed"):
+                print(
+                    f"  {result['frames']} frames in {result['render_seconds']:.1f}s "
+                    f"({result['frames_per_second']:.1f} frames/s), "
+                    f"{result['seconds_per_section']:.2f}s per section, peak {result['peak_rss_mb'] or 0:.0f} MB"
+                )
+            results.append(result)
+    return {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "manim": manim_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(old_file: str, new_file: str) -> None:
+    """Prints how every benchmark changed between two results files."""
+    with open(old_file, "r") as f:
+        old = json.load(f)
+    with open(new_file, "r") as f:
+        new = json.load(f)
+    old_results = {(r["benchmark"], r["quality"]): r for r in old["results"] if not r.get("failed")}
+    print(f"{old['commit']} (manim {old['manim']}) -> {new['commit']} (manim {new['manim']})")
+    for result in new["results"]:
+        key = (result["benchmark"], result["quality"])
+        if result.get("failed") or key not in old_results:
+            continue
+        before = old_results[key]
+        line = f"  {key[0]:<12} -q{key[1]}"
+        for metric, label in (("frames_per_second", "frames/s"), ("seconds_per_section", "s/section"), ("peak_rss_mb", "MB")):
+            if not before.get(metric) or result.get(metric) is None:
+                continue
+            change = 100 * (result[metric] - before[metric]) / before[metric]
+            line += f"  {label} {before[metric]:.1f} -> {result[metric]:.1f} ({change:+.1f}%)"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark rendering with synthetic scripts.")
+    parser.add_argument("-q", "--quality", nargs="+", default=["l"], help="Quality flags: l, m, h")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        qualities = [quality[-1] for quality in args.quality]
+        report = run_benchmarks(args.only or list(BENCHMARKS), qualities)
+        output = args.output or os.path.join(RESULTS_DIR, f"results-{report['commit']}.json")
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output}")
@@ -1,13 +1,26 @@
 import asyncio
-import edge_tts
-from mutagen.mp3 import MP3
+import av
+import numpy as np
 import os
-import hashlib
-import datetime
+import time
+import render_metrics
+from tts_client import get_tts_client
+from voice_cache import VoiceCache, voice_key
 
 # Default voice
 DEFAULT_VOICE = "en-GB-SoniaNeural"
 OUTPUT_DIR = "./media/sounds"
+# How many edge-tts requests generate_voices keeps in flight
+PREFETCH_CONCURRENCY = 8
+# edge-tts prosody settings, part of the voiceover cache key
+TTS_PARAMS = {"rate": "+0%", "volume": "+0%", "pitch": "+0Hz"}
+# "edge" (edge-tts, needs network) or "stub" (silent clips of the expected
+# length, for benchmarks and offline runs)
+TTS_BACKEND_ENV = "MANIM_TTS_BACKEND"
+# Narration speed of the default voice, used to size stub clips
+WORDS_PER_SECOND = 2.5
+
+_voice_cache = None
 
 
 def get_voice():
@@ -28,22 +41,107 @@ def get_voice():
 VOICE = get_voice()
 
 
-def get_audio_duration(file_path: str) -> float:
-    """Get the duration of an audio file."""
+def get_tts_backend() -> str:
+    return os.environ.get(TTS_BACKEND_ENV, "edge")
+
+
+def estimate_duration(text: str) -> float:
+    """Roughly how long the voice takes to say text."""
+    return len(text.split()) / WORDS_PER_SECOND + 0.3
+
+
+def get_voice_cache() -> VoiceCache:
+    """The voiceover cache in OUTPUT_DIR, shared by every call in this process."""
+    global _voice_cache
+    if _voice_cache is None:
+        _voice_cache = VoiceCache(OUTPUT_DIR)
+    return _voice_cache
+
+
+def voiceover_key(text: str, voice: str | None = None) -> str:
+    """Cache key of the clip for text, with the current voice unless one is given."""
+    params = dict(TTS_PARAMS)
+    backend = get_tts_backend()
+    if backend != "edge":
+        # Keep stub clips apart from real ones
+        params["backend"] = backend
+    return voice_key(text, voice or get_voice(), **params)
+
+
+async def _generate_voiceover(text: str, output_file: str, voice: str) -> dict:
+    """
+    Generate voiceover from text and save it to a file. Returns its
+    duration and word timings, taken from the TTS stream.
+    """
+    if get_tts_backend() == "stub":
+        return {"duration": _write_silent_mp3(output_file, estimate_duration(text)), "words": None}
+    # Runs on the shared client's loop, see the sync wrappers below
+    return await get_tts_client().synthesize(text, output_file, voice, **TTS_PARAMS)
+
+
+def _write_silent_mp3(output_file: str, seconds: float, rate: int = 24000) -> float:
+    """
+    Silent mono MP3 in edge-tts' format, so the rest of the pipeline treats
+    it like a real clip. Returns its duration.
+    """
+    with av.open(output_file, mode="w", format="mp3") as container:
+        stream = container.add_stream("mp3", rate=rate)
+        stream.layout = "mono"
+        stream.bit_rate = 48000
+        total = int(seconds * rate)
+        position = 0
+        while position < total:
+            # One MP3 frame at a time
+            count = min(1152, total - position)
+            frame = av.AudioFrame.from_ndarray(np.zeros((1, count), dtype=np.float32), format="fltp", layout="mono")
+            frame.sample_rate = rate
+            frame.pts = position
+            for packet in stream.encode(frame):
+                container.mux(packet)
+            position += count
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return total / rate
+
+
+async def _generate_voice_and_get_duration(text: str) -> tuple[str | None, float]:
+    if not text:
+        return None, 0
+
+    # Get the current voice setting each time, it is part of the cache key
+    current_voice = get_voice()
+    cache = get_voice_cache()
+    key = voiceover_key(text, current_voice)
+
+    started = time.perf_counter()
+    cached = cache.get(key)
+    if cached:
+        print(f"Voiceover already exists for: {text}")
+        _record_tts(started, text, hit=True)
+        return cached
+
+    print(f"Generating voiceover for: {text} (Voice: {current_voice})")
+    temp_file = cache.temp_path(key)
     try:
-        audio = MP3(file_path)
-        return audio.info.length
+        clip = await _generate_voiceover(text, temp_file, current_voice)
     except Exception as e:
-        print(f"Error getting duration for {file_path}: {e}")
-        return 0
+        print(f"Error generating voiceover: {e}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        _record_tts(started, text, hit=False, error=str(e))
+        return None, 0
 
+    # The stream told us the duration, the cache index remembers it
+    duration = clip["duration"]
+    output_file = cache.put(key, temp_file, text, current_voice, duration, clip["words"])
+    _record_tts(started, text, hit=False, duration=duration)
+    return output_file, duration
 
-async def _generate_voiceover(text: str, output_file: str) -> None:
-    """Generate voiceover from text and save it to a file."""
-    # Get the current voice setting each time
-    current_voice = get_voice()
-    communicate = edge_tts.Communicate(text, current_voice)
-    await communicate.save(output_file)
+
+def _record_tts(started: float, text: str, hit: bool, **fields) -> None:
+    seconds = time.perf_counter() - started
+    render_metrics.add("tts_seconds", seconds)
+    render_metrics.record("tts", seconds=seconds, hit=hit, characters=len(text), **fields)
 
 
 def generate_voice_and_get_duration(text: str) -> tuple[str | None, float]:
@@ -51,32 +149,38 @@ def generate_voice_and_get_duration(text: str) -> tuple[str | None, float]:
     Generates a voiceover for the given text, saves it as an MP3 file,
     and returns the file path and duration.
     """
-    if not text:
-        return None, 0
+    return get_tts_client().run(_generate_voice_and_get_duration(text))
 
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
 
-    # Include voice in filename hash to avoid conflicts when voice changes
-    current_voice = get_voice()
-    text_with_voice = f"{text}_{current_voice}"
-    filename = f"{hashlib.sha256(text_with_voice.encode('utf-8')).hexdigest()}{datetime.datetime.now().strftime('%d-%m-%Y-%H-%M-%S')}.mp3"
-    output_file = os.path.abspath(os.path.join(OUTPUT_DIR, filename))
-
-    # Generate the voiceover if it doesn't already exist
-    if not os.path.exists(output_file):
-        print(f"Generating voiceover for: {text} (Voice: {current_voice})")
-        try:
-            asyncio.run(_generate_voiceover(text, output_file))
-        except Exception as e:
-            print(f"Error generating voiceover: {e}")
-            return None, 0
-    else:
-        print(f"Voiceover already exists for: {text}")
+async def _generate_voices(texts: list[str], max_concurrency: int) -> list[tuple[str | None, float]]:
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    # Get the duration of the audio file
-    duration = get_audio_duration(output_file)
-    return output_file, duration
+    async def generate(text):
+        async with semaphore:
+            return await _generate_voice_and_get_duration(text)
+
+    return await asyncio.gather(*(generate(text) for text in texts))
+
+
+def generate_voices(texts: list[str], max_concurrency: int = PREFETCH_CONCURRENCY) -> dict[str, tuple[str | None, float]]:
+    """
+    Generates voiceovers for many texts concurrently, at most max_concurrency
+    requests at a time.
+
+    Returns a map of text -> (file path, duration), same values as
+    generate_voice_and_get_duration.
+    """
+    unique_texts = list(dict.fromkeys(text for text in texts if text))
+    if not unique_texts:
+        return {}
+    results = get_tts_client().run(_generate_voices(unique_texts, max_concurrency))
+    return dict(zip(unique_texts, results))
+
+
+def get_word_timings(audio_file: str) -> list | None:
+    """Per-word timings ([{"word", "start", "end"}, ...] in seconds) of a generated clip, if known."""
+    key = os.path.splitext(os.path.basename(audio_file))[0]
+    return get_voice_cache().words(key)
 
 
 if __name__ == "__main__":
@@ -6,8 +6,18 @@ import os
 import glob
 import subprocess
 import threading
+import time
 import datetime
 from pathlib import Path
+from render_metrics import METRICS_FILE_ENV, metrics_file_for
+from job_store import DONE, FAILED, RUNNING, get_job_store
+from scheduler import ENCODER_THREADS_ENV, INTERACTIVE, acquire
+from progress import RenderProgress, describe, plan_totals
+
+# Seconds between progress bar updates while rendering
+PROGRESS_INTERVAL = 1
+
+STATE_ICONS = {DONE: "✅", FAILED: "❌", RUNNING: "🔄"}
 
 # Set appearance
 ctk.set_appearance_mode("dark")
@@ -174,19 +184,12 @@ class ManimationsGUI:
         # Get all JSON files in scripts folder
         script_files = glob.glob(os.path.join("scripts", "*.json"))
         
-        # Get processed files
-        done_file = os.path.join("scripts", "done.txt")
-        processed_files = []
-        if os.path.exists(done_file):
-            with open(done_file, 'r') as f:
-                processed_files = [line.strip() for line in f.readlines()]
+        # Get render states from the job queue
+        states = get_job_store().states()
         
         for script_file in sorted(script_files):
             basename = os.path.basename(script_file)
-            if basename in processed_files:
-                display_name = f"✅ {basename}"
-            else:
-                display_name = f"⏳ {basename}"
+            display_name = f"{STATE_ICONS.get(states.get(basename), '⏳')} {basename}"
             
             self.script_listbox.insert(tk.END, display_name)
             
@@ -282,7 +285,7 @@ class ManimationsGUI:
             
         def run_generation():
             self.update_status("Generating single video...")
-            self.progress_bar.set(0.5)
+            self.progress_bar.set(0)
             
             # Get quality setting
             quality = self.quality_var.get().split()[0]  # Extract 'ql', 'qm', or 'qh'
@@ -303,8 +306,23 @@ class ManimationsGUI:
             
             try:
                 os.makedirs("logs", exist_ok=True)
-                with open(log_filename, "w", encoding="utf-8") as log_file:
-                    process = subprocess.run(command, stdout=log_file, stderr=subprocess.STDOUT, text=True)
+                tracker = RenderProgress(log_filename, plan=plan_totals(self.current_script, quality[-1]))
+                # A preview someone is waiting for goes ahead of batch renders
+                with acquire("manim", INTERACTIVE, self.current_script) as lease, open(log_filename, "w", encoding="utf-8") as log_file:
+                    process = subprocess.Popen(
+                        command,
+                        stdout=log_file,
+                        stderr=subprocess.STDOUT,
+                        text=True,
+                        env={
+                            **os.environ,
+                            METRICS_FILE_ENV: metrics_file_for(log_filename),
+                            ENCODER_THREADS_ENV: str(lease.threads),
+                        },
+                    )
+                    while process.poll() is None:
+                        self.show_progress(tracker.update())
+                        time.sleep(PROGRESS_INTERVAL)
                 
                 if process.returncode == 0:
                     self.update_status("Video generated successfully!")
@@ -329,10 +347,7 @@ class ManimationsGUI:
             
             # Run wrapper.py with quality setting
             try:
-                # Modify wrapper.py to use the selected quality
-                self.modify_wrapper_quality(quality)
-                
-                process = subprocess.run(["uv", "run", "wrapper.py"], capture_output=True, text=True)
+                process = subprocess.run(["uv", "run", "wrapper.py", "-q", quality], capture_output=True, text=True)
                 
                 if process.returncode == 0:
                     self.update_status("All scripts processed successfully!")
@@ -350,20 +365,6 @@ class ManimationsGUI:
             
         threading.Thread(target=run_batch, daemon=True).start()
         
-    def modify_wrapper_quality(self, quality):
-        """Temporarily modify wrapper.py to use the selected quality"""
-        # Read wrapper.py
-        with open("wrapper.py", 'r') as f:
-            content = f.read()
-        
-        # Replace the quality setting
-        import re
-        content = re.sub(r'"-ql"', f'"-{quality}"', content)
-        
-        # Write back
-        with open("wrapper.py", 'w') as f:
-            f.write(content)
-            
     def generate_shorts(self):
         def run_shorts():
             self.update_status("Generating shorts...")
@@ -444,6 +445,11 @@ For more information, check the README.md file.
         text_widget.insert(1.0, help_text)
         text_widget.config(state=tk.DISABLED)
         
+    def show_progress(self, progress):
+        if progress["percent"] is not None:
+            self.progress_bar.set(progress["percent"] / 100)
+        self.status_label.configure(text=f"Rendering: {describe(progress)}")
+
     def update_status(self, status):
         self.status_label.configure(text=status)
         if self.show_logs_var.get():
@@ -6,6 +6,9 @@ import glob
 import threading
 import subprocess
 import json
+from job_store import DONE, FAILED, RUNNING, get_job_store
+
+STATE_ICONS = {DONE: "✅", FAILED: "❌", RUNNING: "🔄"}
 
 class App(customtkinter.CTk):
     def __init__(self):
@@ -14,7 +17,6 @@ class App(customtkinter.CTk):
         self.title("Manimations GUI")
         self.geometry("1200x700")
         self.scripts_dir = "scripts"
-        self.done_file = os.path.join(self.scripts_dir, "done.txt")
         self.current_file_path = None
 
         # Configure grid layout (3 columns, 1 row)
@@ -98,15 +100,12 @@ class App(customtkinter.CTk):
         for i in self.tree.get_children():
             self.tree.delete(i)
 
-        processed_files = []
-        if os.path.exists(self.done_file):
-            with open(self.done_file, 'r') as f:
-                processed_files = [line.strip() for line in f.readlines()]
+        states = get_job_store().states()
 
         script_files = glob.glob(os.path.join(self.scripts_dir, "*.json"))
         for script_file in sorted(script_files):
             file_name = os.path.basename(script_file)
-            status = "✅" if file_name in processed_files else "⏳"
+            status = STATE_ICONS.get(states.get(file_name), "⏳")
             self.tree.insert("", "end", text=file_name, values=(status,), iid=script_file)
 
     def on_script_select(self, event=None):
@@ -0,0 +1,399 @@
+"""
+Durable render job queue, replacing scripts/done.txt.
+
+Every script is a job in scripts/jobs.sqlite with a state:
+
+    queued   waiting for a worker (new scripts, and failed renders that
+             still have attempts left)
+    running  claimed by a worker
+    failed   failed MAX_ATTEMPTS times
+    done     rendered; the output video and log are recorded
+
+with its attempt count, start/finish times, duration, output path, log and
+last error. claim_next() hands a queued job to exactly one worker (the
+state change only succeeds for the worker that sees the job still queued),
+so several wrapper.py processes or threads can drain the queue together.
+
+Content, not file names, decides what needs rendering. Each job keeps a
+hash of its canonical script JSON (keys sorted, whitespace dropped), so a
+rendered script whose content changes is queued again, while a save that
+does not change it is not. Finished videos are also recorded in the outputs
+table under a render key: the script hash plus the render settings (quality,
+voice, main.py). A job whose render key already has a video resolves to that
+MP4 right away instead of rendering the same tutorial twice. Each output's
+size and modification time are recorded too: videos live at ordinary paths
+that a plain manim run (e.g. the GUI) can overwrite, and an output that
+changed since it was recorded no longer counts for its render key.
+
+The database is opened with a busy timeout in WAL mode, like the voiceover
+cache index.
+
+Usage:
+    uv run job_store.py import          # mark the scripts listed in done.txt as done
+    uv run job_store.py list [--state failed]
+    uv run job_store.py requeue scripts/SeleniumBasics1.json
+    uv run job_store.py retry-failed
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+STORE_PATH = os.path.join("scripts", "jobs.sqlite")
+DONE_FILE = os.path.join("scripts", "done.txt")
+# A job is only marked failed after this many failed renders
+MAX_ATTEMPTS = 3
+# Running jobs older than this are assumed to belong to a worker that died
+STALE_SECONDS = 6 * 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+FAILED = "failed"
+DONE = "done"
+
+COLUMNS = (
+    "id",
+    "script",
+    "state",
+    "attempts",
+    "worker",
+    "created",
+    "started",
+    "finished",
+    "duration",
+    "output",
+    "log",
+    "error",
+    "script_hash",
+    "render_key",
+)
+# Added after the first version of the table
+MIGRATED_COLUMNS = {"script_hash": "TEXT", "render_key": "TEXT"}
+MIGRATED_OUTPUT_COLUMNS = {"size": "INTEGER", "mtime_ns": "INTEGER"}
+MAIN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def data_hash(data) -> str:
+    """Hash of a script's canonical JSON: same content, same hash, however it is formatted."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def script_hash(script: str) -> str:
+    with open(script, "r", encoding="utf-8") as f:
+        return data_hash(json.load(f))
+
+
+def render_key(content_hash: str, quality: str) -> str:
+    """Key of a finished video: the script content plus everything else that changes the render."""
+    from generate_voice import get_voice
+
+    with open(MAIN_FILE, "rb") as f:
+        scene = hashlib.sha256(f.read()).hexdigest()
+    payload = {"script": content_hash, "quality": quality[-1], "voice": get_voice(), "scene": scene}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class JobStore:
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    script TEXT NOT NULL UNIQUE,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    created REAL NOT NULL,
+                    started REAL,
+                    finished REAL,
+                    duration REAL,
+                    output TEXT,
+                    log TEXT,
+                    error TEXT,
+                    script_hash TEXT,
+                    render_key TEXT
+                )
+                """
+            )
+            existing = {row[1] for row in db.execute("PRAGMA table_info(jobs)")}
+            for column, kind in MIGRATED_COLUMNS.items():
+                if column not in existing:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id)")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outputs (
+                    render_key TEXT PRIMARY KEY,
+                    output TEXT NOT NULL,
+                    script TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER
+                )
+                """
+            )
+            existing = {row[1] for row in db.execute("PRAGMA table_info(outputs)")}
+            for column, kind in MIGRATED_OUTPUT_COLUMNS.items():
+                if column not in existing:
+                    db.execute(f"ALTER TABLE outputs ADD COLUMN {column} {kind}")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _row(row) -> dict | None:
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def enqueue(self, script: str, content_hash: str | None = None) -> bool:
+        """Adds a script as a queued job. Returns False if it already has one."""
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO jobs (script, state, created, script_hash) VALUES (?, ?, ?, ?)",
+                (os.path.normpath(script), QUEUED, time.time(), content_hash),
+            )
+        return cursor.rowcount == 1
+
+    def sync_script(self, script: str) -> str | None:
+        """
+        Queues a script if it is new ("new") or a finished job whose content
+        changed since ("changed"). Returns None when there is nothing to do.
+        """
+        try:
+            content_hash = script_hash(script)
+        except (OSError, json.JSONDecodeError, UnicodeDecodeError):
+            # Half written or broken, its next save will be seen again
+            return None
+        job = self.get(script)
+        if job is None:
+            return "new" if self.enqueue(script, content_hash) else None
+        if job["script_hash"] == content_hash or job["state"] not in (DONE, FAILED):
+            return None
+        with self._connect() as db:
+            if job["script_hash"] is None:
+                # Imported from done.txt: the rendered content is not known, take it as current
+                db.execute("UPDATE jobs SET script_hash = ? WHERE id = ?", (content_hash, job["id"]))
+                return None
+            db.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, error = NULL, script_hash = ? WHERE id = ?",
+                (QUEUED, content_hash, job["id"]),
+            )
+        return "changed"
+
+    def sync_scripts(self, directory: str = "scripts") -> int:
+        """Queues every JSON script in directory that is new or changed. Returns how many were queued."""
+        scripts = sorted(glob.glob(os.path.join(directory, "*.json")))
+        return sum(self.sync_script(script) is not None for script in scripts)
+
+    def import_done_file(self, done_file: str = DONE_FILE) -> int:
+        """
+        Marks the scripts listed in an old done.txt as done, unless they are
+        already jobs. Returns how many were imported.
+        """
+        if not os.path.exists(done_file):
+            return 0
+        directory = os.path.dirname(done_file)
+        with open(done_file, "r") as f:
+            names = [line.strip() for line in f if line.strip()]
+        imported = 0
+        with self._connect() as db:
+            for name in dict.fromkeys(names):
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO jobs (script, state, created, finished) VALUES (?, ?, ?, ?)",
+                    (os.path.normpath(os.path.join(directory, name)), DONE, time.time(), None),
+                )
+                imported += cursor.rowcount
+        return imported
+
+    def claim_next(self, worker: str) -> dict | None:
+        """Atomically moves the oldest queued job to running for worker and returns it, or None."""
+        while True:
+            with self._connect() as db:
+                row = db.execute("SELECT id FROM jobs WHERE state = ? ORDER BY id LIMIT 1", (QUEUED,)).fetchone()
+                if row is None:
+                    return None
+                cursor = db.execute(
+                    """
+                    UPDATE jobs SET state = ?, attempts = attempts + 1, worker = ?, started = ?,
+                        finished = NULL, duration = NULL, error = NULL
+                    WHERE id = ? AND state = ?
+                    """,
+                    (RUNNING, worker, time.time(), row[0], QUEUED),
+                )
+                if cursor.rowcount == 1:
+                    return self._row(db.execute("SELECT * FROM jobs WHERE id = ?", (row[0],)).fetchone())
+            # Another worker claimed it first, try the next one
+
+    def finish(
+        self,
+        job_id: int,
+        output: str | None = None,
+        log: str | None = None,
+        key: str | None = None,
+        content_hash: str | None = None,
+    ) -> None:
+        """
+        Marks a job done. content_hash is the script content that was
+        rendered; with a render key, the output is remembered for identical jobs.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                """
+                UPDATE jobs SET state = ?, finished = ?, duration = ? - started, output = ?, log = ?,
+                    render_key = ?, script_hash = COALESCE(?, script_hash)
+                WHERE id = ?
+                """,
+                (DONE, now, now, output, log, key, content_hash, job_id),
+            )
+            if key and output:
+                script = db.execute("SELECT script FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+                self._add_output(db, key, output, script, now)
+
+    def add_output(self, key: str, output: str, script: str) -> None:
+        """Remembers a video rendered outside the jobs table (e.g. by the MCP server) under its render key."""
+        with self._connect() as db:
+            self._add_output(db, key, output, script, time.time())
+
+    def _add_output(self, db, key, output, script, now) -> None:
+        # A re-render of an edited script overwrites its video, which then no longer matches older keys
+        db.execute("DELETE FROM outputs WHERE output = ? AND render_key != ?", (output, key))
+        try:
+            stat = os.stat(output)
+        except OSError:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO outputs (render_key, output, script, created, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, output, script, now, stat.st_size, stat.st_mtime_ns),
+        )
+
+    def find_output(self, key: str) -> str | None:
+        """The video already rendered for a render key, if it still exists unchanged."""
+        with self._connect() as db:
+            row = db.execute("SELECT output, size, mtime_ns FROM outputs WHERE render_key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            output, size, mtime_ns = row
+            try:
+                stat = os.stat(output)
+                unchanged = (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns)
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                # Deleted, or overwritten by a render the store did not see
+                db.execute("DELETE FROM outputs WHERE render_key = ?", (key,))
+                return None
+        return output
+
+    def fail(self, job_id: int, error: str, log: str | None = None, max_attempts: int = MAX_ATTEMPTS) -> str:
+        """Records a failed render. The job is queued again until it has used max_attempts. Returns the new state."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                """
+                UPDATE jobs SET state = CASE WHEN attempts < ? THEN ? ELSE ? END,
+                    finished = ?, duration = ? - started, error = ?, log = ?
+                WHERE id = ?
+                """,
+                (max_attempts, QUEUED, FAILED, now, now, error, log, job_id),
+            )
+            return db.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    def release(self, job_id: int) -> bool:
+        """Puts a running job back in the queue without counting the attempt, e.g. when its worker is stopped."""
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET state = ?, attempts = MAX(attempts - 1, 0), worker = NULL, started = NULL WHERE id = ? AND state = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def requeue(self, script: str) -> bool:
+        """Queues a script again with a fresh attempt count, whatever its state."""
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, error = NULL WHERE script = ?",
+                (QUEUED, os.path.normpath(script)),
+            )
+        return cursor.rowcount == 1 or self.enqueue(script)
+
+    def retry_failed(self) -> int:
+        with self._connect() as db:
+            cursor = db.execute("UPDATE jobs SET state = ?, attempts = 0 WHERE state = ?", (QUEUED, FAILED))
+        return cursor.rowcount
+
+    def requeue_stale(self, older_than: float = STALE_SECONDS) -> int:
+        """Queues running jobs whose worker has not reported back in older_than seconds."""
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET state = ? WHERE state = ? AND started < ?",
+                (QUEUED, RUNNING, time.time() - older_than),
+            )
+        return cursor.rowcount
+
+    def get(self, script: str) -> dict | None:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE script = ?", (os.path.normpath(script),)).fetchone()
+        return self._row(row)
+
+    def jobs(self, state: str | None = None) -> list[dict]:
+        with self._connect() as db:
+            if state:
+                rows = db.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id", (state,)).fetchall()
+            else:
+                rows = db.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [self._row(row) for row in rows]
+
+    def states(self) -> dict:
+        """Script file name -> state, for the GUI script lists."""
+        with self._connect() as db:
+            rows = db.execute("SELECT script, state FROM jobs").fetchall()
+        return {os.path.basename(script): state for script, state in rows}
+
+
+def get_job_store() -> JobStore:
+    """The job store, with the old done.txt imported the first time."""
+    store = JobStore()
+    store.import_done_file()
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and manage the render job queue.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("import", help="Import scripts/done.txt and queue new scripts")
+    list_parser = commands.add_parser("list", help="List jobs")
+    list_parser.add_argument("--state", choices=[QUEUED, RUNNING, FAILED, DONE])
+    requeue_parser = commands.add_parser("requeue", help="Queue a script again")
+    requeue_parser.add_argument("script")
+    commands.add_parser("retry-failed", help="Queue every failed job again")
+    args = parser.parse_args()
+
+    store = JobStore()
+    if args.command == "import":
+        print(f"Imported {store.import_done_file()} scripts from {DONE_FILE}")
+        print(f"Queued {store.sync_scripts()} new or changed scripts")
+    elif args.command == "list":
+        for job in store.jobs(args.state):
+            duration = f"{job['duration']:.0f}s" if job["duration"] is not None else "-"
+            print(f"{job['state']:<8} {job['attempts']}x {duration:>6}  {job['script']}  {job['output'] or job['error'] or ''}")
+    elif args.command == "requeue":
+        store.requeue(args.script)
+        print(f"Queued {args.script}")
+    elif args.command == "retry-failed":
+        print(f"Queued {store.retry_failed()} failed jobs again")
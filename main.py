@@ -38,35 +38,172 @@ Alternate or mix code and quiz sections for engagement.
 
 
 from manim import *
+from pydub import AudioSegment
 import json
 import os
-from generate_voice import generate_voice_and_get_duration
+import time
+import render_metrics
+from generate_voice import generate_voice_and_get_duration, generate_voices
+from mobject_cache import cached_mobject
+from stingers import play_stinger, register_stinger
+from tutorial_writer import TutorialFileWriter
+
+
+# Look of every code block. Also part of the section cache key (section_cache.py)
+CODE_STYLE = {
+    "language": "python",
+    "formatter_style": "monokai",
+    "background": "window",
+    "add_line_numbers": True,
+    "background_config": {
+        "buff": 0.3,
+        "fill_color": ManimColor("#222"),
+        "stroke_color": MAROON_A,
+        "corner_radius": 0.3,
+        "stroke_width": 1,
+        "fill_opacity": 1,
+    },
+    "paragraph_config": {
+        "font": "CaskaydiaMono Nerd Font Mono",
+        "font_size": 24,
+        "line_spacing": 0.5,
+        "disable_ligatures": True,
+    },
+}
+
+
+def make_code(code_string):
+    """Code block in CODE_STYLE, loaded from the mobject cache when possible."""
+    return cached_mobject(
+        "code",
+        {"code_string": code_string, **CODE_STYLE},
+        lambda: Code(code_string=code_string, **CODE_STYLE),
+    )
+
+
+def make_paragraph(*lines, **kwargs):
+    """Paragraph, loaded from the mobject cache when possible."""
+    return cached_mobject("paragraph", {"lines": lines, **kwargs}, lambda: Paragraph(*lines, **kwargs))
+
+
+def play_section_transition(scene):
+    # Simple fade to black and back in
+    fade_rect = Rectangle(
+        width=config.frame_width,
+        height=config.frame_height,
+        fill_color=BLACK,
+        fill_opacity=1,
+        stroke_width=0,
+    )
+    scene.play(FadeIn(fade_rect, run_time=0.5))
+    scene.wait(0.2)
+    scene.play(FadeOut(fade_rect, run_time=0.5))
+
+
+register_stinger("section_transition", play_section_transition)
+
+
+def quiz_question_narration(question):
+    return f"Please try to answer this question - {question}"
+
+
+def quiz_answer_narration(answer):
+    return f"Answer should be - {answer}"
+
+
+def section_narration(section):
+    """Texts the voiceover speaks for a section, in the order they are played."""
+    section_type = section.get("type", "code")
+    if section_type == "quiz":
+        question = section.get("question", "")
+        answer = section.get("answer", "")
+        if not question or not answer:
+            return []
+        return [quiz_question_narration(question), quiz_answer_narration(answer)]
+    if section_type == "real_world":
+        return []
+    explanation = section.get("explanation", "")
+    return [explanation] if explanation else []
 
 
 class Video(Scene):
-    def __init__(self, **kwargs):
+    def __init__(self, tutorial_data=None, **kwargs):
         # Get the script file path from the environment variable
         json_path = os.environ.get("MANIM_SCRIPT_FILE", "test.json")
+        if kwargs.get("renderer") is None and config.renderer == RendererType.CAIRO:
+            kwargs["renderer"] = CairoRenderer(
+                file_writer_class=TutorialFileWriter,
+                skip_animations=kwargs.get("skip_animations", False),
+            )
         super().__init__(**kwargs)
-        with open(json_path, "r") as f:
-            self.tutorial_data = json.load(f)
+        if tutorial_data is None:
+            with open(json_path, "r") as f:
+                tutorial_data = json.load(f)
+        self.tutorial_data = tutorial_data
+        self.narration = {}
+
+    def setup(self):
+        self.render_started = time.perf_counter()
+        # Synthesize every voiceover up front, concurrently, before construct runs
+        texts = [text for section in self.narrated_sections() for text in section_narration(section)]
+        self.narration = generate_voices(texts)
+        render_metrics.record("prefetch", seconds=time.perf_counter() - self.render_started, clips=len(self.narration))
+
+    def tear_down(self):
+        if not config.dry_run and not self.renderer.skip_animations:
+            from render_plan import record_throughput, resolution_label
+
+            frames = round(self.time * config.frame_rate)
+            seconds = time.perf_counter() - self.render_started
+            record_throughput(config.pixel_height, config.frame_rate, frames, seconds)
+            render_metrics.record(
+                "render",
+                scene=type(self).__name__,
+                seconds=seconds,
+                frames=frames,
+                duration=self.time,
+                resolution=resolution_label(config.pixel_height, config.frame_rate),
+            )
+
+    def narrated_sections(self):
+        return self.tutorial_data.get("sections", [])
+
+    def add_sound(self, sound_file, time_offset=0, gain=None, **kwargs):
+        file_writer = self.renderer.file_writer
+        if getattr(file_writer, "premix_narration", False) and not self.renderer.skip_animations:
+            # Mixed in one streaming pass when the movie is combined
+            file_writer.add_narration_cue(sound_file, self.time + time_offset, gain)
+            return
+        super().add_sound(sound_file, time_offset=time_offset, gain=gain, **kwargs)
+
+    def voiceover(self, text):
+        """Returns (audio file, duration) for text, from the prefetched map when possible."""
+        if text in self.narration:
+            return self.narration[text]
+        return generate_voice_and_get_duration(text)
 
     def construct(self):
-        self.show_intro(self.tutorial_data.get("intro", ""))
+        with render_metrics.part("intro", "intro"):
+            self.show_intro(self.tutorial_data.get("intro", ""))
         sections = self.tutorial_data.get("sections", [])
-        for section in sections:
-            section_type = section.get("type", "code")
-            if section_type == "quiz":
-                self.show_quiz_section(section)
-            elif section_type == "real_world":
-                self.show_real_world_section(section)
-            else:
-                self.show_code_section(section)
-            # Animated transition between sections
-            self.animate_section_transition()
-        self.show_outro(self.tutorial_data.get("outro", ""))
+        for index, section in enumerate(sections):
+            with render_metrics.part(f"section-{index:02d}", section.get("type", "code")):
+                self.show_section(section)
+                # Animated transition between sections
+                self.animate_section_transition()
+        with render_metrics.part("outro", "outro"):
+            self.show_outro(self.tutorial_data.get("outro", ""))
         # self.show_outro("Thank you for watching! Consider subscribing to the channel.")
 
+    def show_section(self, section):
+        section_type = section.get("type", "code")
+        if section_type == "quiz":
+            self.show_quiz_section(section)
+        elif section_type == "real_world":
+            self.show_real_world_section(section)
+        else:
+            self.show_code_section(section)
+
     def show_intro(self, text):
         if not text:
             return
@@ -75,36 +212,22 @@ class Video(Scene):
         self.wait(1)
         self.play(intro.animate.to_edge(UP))
 
+    def add_intro_title(self, text):
+        """Puts the intro text where show_intro leaves it, without animating."""
+        if not text:
+            return
+        self.add(Text(text, font_size=24).to_edge(UP))
+
     def show_code_section(self, section):
         code_string = section.get("code_string", "")
         annotation = section.get("annotation", "")
         explanation = section.get("explanation", "")
 
         # Generate voiceover and get duration
-        audio_file, audio_duration = generate_voice_and_get_duration(explanation)
+        audio_file, audio_duration = self.voiceover(explanation)
 
         # Code block
-        code = Code(
-            code_string=code_string,
-            language="python",
-            formatter_style="monokai",
-            background="window",
-            add_line_numbers=True,
-            background_config={
-                "buff": 0.3,
-                "fill_color": ManimColor("#222"),
-                "stroke_color": MAROON_A,
-                "corner_radius": 0.3,
-                "stroke_width": 1,
-                "fill_opacity": 1,
-            },
-            paragraph_config={
-                "font": "CaskaydiaMono Nerd Font Mono",
-                "font_size": 24,
-                "line_spacing": 0.5,
-                "disable_ligatures": True,
-            },
-        )
+        code = make_code(code_string)
 
         self.play(FadeIn(code, shift=UP))
         self.wait(0.7)
@@ -113,14 +236,14 @@ class Video(Scene):
 
         # Annotation text (usually below)
         if annotation:
-            annotation_text = Paragraph(annotation, font_size=32).next_to(code, DOWN)
+            annotation_text = make_paragraph(annotation, font_size=32).next_to(code, DOWN)
             self.play(FadeIn(annotation_text))
             self.wait(1)
             elements.append(annotation_text)
 
         # Explanation text and audio
         if explanation:
-            explanation_text = Paragraph(
+            explanation_text = make_paragraph(
                 explanation, font_size=24, slant=ITALIC, line_spacing=0.5
             )
             explanation_text.next_to(code, DOWN, buff=1.5)
@@ -139,23 +262,14 @@ class Video(Scene):
     def show_outro(self, text):
         if not text:
             return
-        outro = Paragraph(text, font_size=24)
+        outro = make_paragraph(text, font_size=24)
         outro.scale_to_fit_width(config.frame_width - 1)
         self.play(Write(outro))
         self.wait(2)
 
     def animate_section_transition(self):
-        # Simple fade to black and back in
-        fade_rect = Rectangle(
-            width=config.frame_width,
-            height=config.frame_height,
-            fill_color=BLACK,
-            fill_opacity=1,
-            stroke_width=0,
-        )
-        self.play(FadeIn(fade_rect, run_time=0.5))
-        self.wait(0.2)
-        self.play(FadeOut(fade_rect, run_time=0.5))
+        # Rendered once, then spliced in from the stinger cache
+        play_stinger(self, "section_transition")
 
     def show_quiz_section(self, section):
         question = section.get("question", "")
@@ -163,15 +277,15 @@ class Video(Scene):
         if not question or not answer:
             return
         # Generate voiceover for question and answer
-        q_audio, q_duration = generate_voice_and_get_duration(f"Please try to answer this question - {question}")
-        a_audio, a_duration = generate_voice_and_get_duration(f"Answer should be - {answer}")
-        q_text = Paragraph(f"Quiz: {question}", font_size=32)
+        q_audio, q_duration = self.voiceover(quiz_question_narration(question))
+        a_audio, a_duration = self.voiceover(quiz_answer_narration(answer))
+        q_text = make_paragraph(f"Quiz: {question}", font_size=32)
         self.play(Write(q_text))
         if q_audio:
             self.add_sound(q_audio)
         self.wait(q_duration + 3)
         a_text = (
-            Paragraph(f"Answer: {answer}", font_size=28, color=GREEN)
+            make_paragraph(f"Answer: {answer}", font_size=28, color=GREEN)
             .next_to(q_text, DOWN)
         )
         self.play(Write(a_text))
@@ -185,35 +299,52 @@ class Video(Scene):
         code = section.get("code_string", "")
         elements = []
         if desc:
-            desc_text = Paragraph(desc, font_size=28)
+            desc_text = make_paragraph(desc, font_size=28)
             self.play(Write(desc_text))
             self.wait(1)
             elements.append(desc_text)
         if code:
-            code_block = Code(
-                code_string=code,
-                language="python",
-                formatter_style="monokai",
-                background="window",
-                add_line_numbers=True,
-                background_config={
-                    "buff": 0.3,
-                    "fill_color": ManimColor("#222"),
-                    "stroke_color": MAROON_A,
-                    "corner_radius": 0.3,
-                    "stroke_width": 1,
-                    "fill_opacity": 1,
-                },
-                paragraph_config={
-                    "font": "CaskaydiaMono Nerd Font Mono",
-                    "font_size": 24,
-                    "line_spacing": 0.5,
-                    "disable_ligatures": True,
-                },
-            )
+            code_block = make_code(code)
             self.play(FadeIn(code_block, shift=UP))
             self.wait(2)
             elements.append(code_block)
         if elements:
             self.play(FadeOut(Group(*elements)))
 
+
+class SectionVideo(Video):
+    """
+    Renders one part of the tutorial on its own: "intro", "outro" or the
+    index of a section (played together with the transition after it).
+    Used by section_cache.py to cache and re-stitch parts independently.
+    """
+
+    def __init__(self, part="intro", tutorial_data=None, **kwargs):
+        self.part = part
+        super().__init__(tutorial_data=tutorial_data, **kwargs)
+
+    def narrated_sections(self):
+        if isinstance(self.part, int):
+            return [self.tutorial_data["sections"][self.part]]
+        return []
+
+    def construct(self):
+        intro = self.tutorial_data.get("intro", "")
+        if self.part == "intro":
+            with render_metrics.part("intro", "intro"):
+                self.show_intro(intro)
+        else:
+            # The intro title stays pinned at the top for the rest of the video
+            self.add_intro_title(intro)
+            if self.part == "outro":
+                with render_metrics.part("outro", "outro"):
+                    self.show_outro(self.tutorial_data.get("outro", ""))
+            else:
+                section = self.tutorial_data["sections"][self.part]
+                with render_metrics.part(f"section-{self.part:02d}", section.get("type", "code")):
+                    self.show_section(section)
+                    self.animate_section_transition()
+        # Every part gets a full-length audio track, so parts can be joined by stream copy
+        # (a pre-mixed narration track always spans the whole part already)
+        if not getattr(self.renderer.file_writer, "premix_narration", False):
+            self.renderer.file_writer.add_audio_segment(AudioSegment.silent(0), time=self.time)
@@ -0,0 +1,131 @@
+"""
+Warm, long-lived manim workers.
+
+Running `manim main.py Video` per script pays for Python startup,
+`from manim import *` and Pango/Cairo font setup every time. A warm worker
+is a process that imports main.py once, warms up the fonts by laying out
+some text in the code and paragraph fonts, and then renders one job after
+another in-process: a fresh Video scene per job under its own tempconfig
+(quality, media directory, output name). The mobject cache of the process
+stays warm across jobs too.
+
+Each job still gets its own log (stdout/stderr and manim's logger are
+redirected to it), metrics file and media directory, exactly like a job
+run by wrapper.render_job, so the two are interchangeable.
+
+Workers are recycled after MAX_JOBS_PER_WORKER jobs to bound any memory
+growth, and a worker that crashes is replaced without taking the batch down.
+
+Used by `uv run wrapper.py --warm` and `uv run render_daemon.py --warm`.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+
+from render_metrics import METRICS_FILE_ENV
+from scheduler import BATCH, ENCODER_THREADS_ENV, acquire
+
+# Jobs a worker process renders before it is replaced by a fresh one
+MAX_JOBS_PER_WORKER = 50
+
+
+def warm_up():
+    """Imports manim and main.py and loads the fonts, once per worker process."""
+    from manim import Text
+
+    from main import CODE_STYLE, make_paragraph
+
+    Text("warm up", font=CODE_STYLE["paragraph_config"]["font"])
+    make_paragraph("warm up", font_size=24)
+
+
+def render_job_in_process(script_file, quality="l", priority=BATCH):
+    """
+    Renders one script in this process, with the same paths, scheduler lease
+    and return value as wrapper.render_job: (succeeded, video path, log path).
+    """
+    from manim import tempconfig
+
+    from main import Video
+    from section_cache import quality_settings
+    from wrapper import collect_video, job_paths
+
+    paths = job_paths(script_file, quality)
+    os.makedirs("logs", exist_ok=True)
+    succeeded = False
+    with acquire("manim", priority, script_file) as lease:
+        print(f"Starting {script_file} -> {paths['video']} (log: {paths['log']}) in worker {os.getpid()}")
+        # One job at a time per process, so the environment can be set per job
+        os.environ[METRICS_FILE_ENV] = paths["metrics"]
+        os.environ[ENCODER_THREADS_ENV] = str(lease.threads)
+        try:
+            with open(paths["log"], "w", encoding="utf-8") as log_file, redirect_stdout(log_file), redirect_stderr(log_file):
+                try:
+                    with open(script_file, "r") as f:
+                        tutorial_data = json.load(f)
+                    settings = quality_settings(quality)
+                    settings.update(
+                        {
+                            "media_dir": paths["media_dir"],
+                            "output_file": paths["name"],
+                            "disable_caching": True,
+                        }
+                    )
+                    with tempconfig(settings):
+                        scene = Video(tutorial_data=tutorial_data)
+                        scene.render()
+                        paths["job_video"] = str(scene.renderer.file_writer.movie_file_path)
+                    succeeded = os.path.exists(paths["job_video"])
+                except Exception:
+                    traceback.print_exc()
+        finally:
+            os.environ.pop(METRICS_FILE_ENV, None)
+            os.environ.pop(ENCODER_THREADS_ENV, None)
+
+    if succeeded:
+        collect_video(paths)
+    return succeeded, paths["video"], paths["log"]
+
+
+class WarmWorkerPool:
+    """A pool of warm worker processes with the same render(script_file, quality) interface as wrapper.render_job."""
+
+    def __init__(self, workers, max_jobs_per_worker=MAX_JOBS_PER_WORKER):
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.lock = threading.Lock()
+        self.pool = self._start()
+
+    def _start(self):
+        # spawn keeps each worker's manim config independent of this process
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_up,
+            max_tasks_per_child=self.max_jobs_per_worker,
+        )
+
+    def render(self, script_file, quality="l"):
+        with self.lock:
+            pool = self.pool
+        try:
+            return pool.submit(render_job_in_process, script_file, quality).result()
+        except BrokenProcessPool:
+            with self.lock:
+                # Only the first job to notice replaces the pool
+                if self.pool is pool:
+                    print("A warm worker died, starting a fresh pool", file=sys.stderr)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = self._start()
+            raise RuntimeError(f"Worker process died while rendering {script_file}")
+
+    def shutdown(self):
+        with self.lock:
+            self.pool.shutdown()
@@ -0,0 +1,85 @@
+"""
+On-disk cache of finished Code and Paragraph mobjects.
+
+Building a Code block runs Pygments, lays out every line with Pango and
+builds the window chrome; a Paragraph goes through Pango as well. The vector
+geometry that comes out only depends on the constructor arguments, so it is
+pickled to media/mobject_cache/<key>.pkl, keyed by those arguments and the
+manim version. Later runs and other worker processes load it instead of
+rebuilding it. The scripts in a series repeat the same imports and
+boilerplate, so most snippets hit.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import manim
+
+import render_metrics
+
+CACHE_DIR = os.path.join("media", "mobject_cache")
+# Bump when the way mobjects are built changes without the arguments changing
+CACHE_VERSION = 1
+# Construction-only attributes that are not worth (or not possible) to pickle
+TRANSIENT_ATTRIBUTES = ("_code_html",)
+
+_memory = {}
+
+
+def mobject_key(kind: str, params: dict) -> str:
+    payload = {"kind": kind, "params": params, "manim": manim.__version__, "version": CACHE_VERSION}
+    encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _load(path: str):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        print(f"Ignoring unreadable mobject cache entry {path}: {e}")
+        return None
+
+
+def _store(path: str, mobject) -> None:
+    for member in mobject.get_family():
+        for attribute in TRANSIENT_ATTRIBUTES:
+            member.__dict__.pop(attribute, None)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump(mobject, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError, RecursionError) as e:
+        print(f"Could not cache {type(mobject).__name__}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def cached_mobject(kind: str, params: dict, build):
+    """
+    Returns a copy of the mobject build() makes for these params, building it
+    only if neither this process nor the disk cache has it yet.
+    """
+    started = time.perf_counter()
+    key = mobject_key(kind, params)
+    mobject = _memory.get(key)
+    hit = True
+    if mobject is None:
+        path = os.path.join(CACHE_DIR, f"{key}.pkl")
+        if os.path.exists(path):
+            mobject = _load(path)
+        if mobject is None:
+            hit = False
+            mobject = build()
+            _store(path, mobject)
+        _memory[key] = mobject
+    # Callers move and scale what they get, keep the cached one pristine
+    copy = mobject.copy()
+    render_metrics.add("layout_seconds", time.perf_counter() - started)
+    render_metrics.add("layout_hits" if hit else "layout_misses")
+    return copy
@@ -0,0 +1,135 @@
+"""
+Streaming narration track builder.
+
+Instead of overlaying every clip into one in-memory AudioSegment (what
+manim's add_sound does), the narration is mixed block by block from a list
+of cues (start time, audio file) and encoded straight to AAC. Only the clips
+that are playing at the current block are open, so memory stays flat however
+long the video is. The track is then muxed onto the silent video by stream
+copy.
+
+Cues come from the live render (tutorial_writer.TutorialFileWriter) or from
+the sound events of a render_plan plan.
+"""
+
+import os
+
+import av
+import numpy as np
+
+SAMPLE_RATE = 48000
+# One AAC frame
+BLOCK_SAMPLES = 1024
+
+
+class _CueReader:
+    """Decodes one clip on demand, resampled to mono float samples at SAMPLE_RATE."""
+
+    def __init__(self, path: str, start_sample: int, gain: float | None = None):
+        self.start_sample = start_sample
+        self.scale = 10 ** (gain / 20) if gain else 1.0
+        self.container = av.open(path)
+        self.frames = self.container.decode(audio=0)
+        self.resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.decoded_all = False
+
+    @property
+    def finished(self) -> bool:
+        return self.decoded_all and len(self.buffer) == 0
+
+    def read(self, count: int) -> np.ndarray:
+        chunks = [self.buffer]
+        available = len(self.buffer)
+        while available < count and not self.decoded_all:
+            try:
+                resampled = self.resampler.resample(next(self.frames))
+            except StopIteration:
+                # Flush what the resampler still holds
+                resampled = self.resampler.resample(None)
+                self.decoded_all = True
+            for frame in resampled:
+                samples = frame.to_ndarray().reshape(-1)
+                chunks.append(samples)
+                available += len(samples)
+        samples = np.concatenate(chunks) if len(chunks) > 1 else self.buffer
+        self.buffer = samples[count:]
+        return samples[:count] * self.scale
+
+    def close(self) -> None:
+        self.container.close()
+
+
+def build_narration_track(cues: list, duration: float, output_path: str) -> str:
+    """
+    Mixes cues into an AAC track of exactly duration seconds.
+
+    cues is a list of (start seconds, audio file) or (start seconds, audio file, gain in dB).
+    """
+    pending = sorted((cue[0], cue[1], cue[2] if len(cue) > 2 else None) for cue in cues)
+    pending.reverse()
+    total_samples = int(round(duration * SAMPLE_RATE))
+    active = []
+
+    with av.open(output_path, mode="w", format="mp4") as container:
+        stream = container.add_stream("aac", rate=SAMPLE_RATE)
+        stream.layout = "mono"
+        position = 0
+        while position < total_samples:
+            count = min(BLOCK_SAMPLES, total_samples - position)
+            block = np.zeros(count, dtype=np.float32)
+
+            while pending and int(pending[-1][0] * SAMPLE_RATE) < position + count:
+                start, path, gain = pending.pop()
+                if not os.path.exists(path):
+                    print(f"Narration clip missing, skipping: {path}")
+                    continue
+                active.append(_CueReader(path, max(int(start * SAMPLE_RATE), 0), gain))
+
+            for reader in active:
+                offset = max(reader.start_sample - position, 0)
+                samples = reader.read(count - offset)
+                block[offset : offset + len(samples)] += samples
+            for reader in [r for r in active if r.finished]:
+                reader.close()
+                active.remove(reader)
+
+            frame = av.AudioFrame.from_ndarray(
+                np.clip(block, -1.0, 1.0).reshape(1, -1), format="fltp", layout="mono"
+            )
+            frame.sample_rate = SAMPLE_RATE
+            frame.pts = position
+            for packet in stream.encode(frame):
+                container.mux(packet)
+            position += count
+
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+    for reader in active:
+        reader.close()
+    return output_path
+
+
+def mux_audio(video_path: str, audio_path: str) -> str:
+    """Replaces the audio of video_path with audio_path, copying both streams without re-encoding."""
+    temp_path = f"{os.path.splitext(video_path)[0]}_narrated{os.path.splitext(video_path)[1]}"
+    with av.open(video_path) as video_input, av.open(audio_path) as audio_input:
+        video_stream = video_input.streams.video[0]
+        audio_stream = audio_input.streams.audio[0]
+        with av.open(temp_path, mode="w") as output:
+            output_video = output.add_stream(template=video_stream)
+            output_audio = output.add_stream(template=audio_stream)
+            for packet in video_input.demux(video_stream):
+                # Skip the flushing packets demux generates
+                if packet.dts is None:
+                    continue
+                packet.stream = output_video
+                output.mux(packet)
+            for packet in audio_input.demux(audio_stream):
+                if packet.dts is None:
+                    continue
+                packet.stream = output_audio
+                output.mux(packet)
+    os.replace(temp_path, video_path)
+    return video_path
@@ -1,6 +1,7 @@
 import os
 from moviepy import *
 from generate_voice import generate_voice_and_get_duration
+from scheduler import NORMAL, acquire
 
 OUTPUT_FOLDER = "generated_podcasts"
 
@@ -32,7 +33,8 @@ def create_podcast(text: str, image_path: str, output_path: str):
 
     # --- Final Video ---
     video = CompositeVideoClip([bg])
-    video.write_videofile(output_path, fps=30, codec="libx264", audio_codec="aac")
+    with acquire("podcast", NORMAL, output_path) as lease:
+        video.write_videofile(output_path, fps=30, codec="libx264", audio_codec="aac", threads=lease.threads)
     print(f"Podcast saved to: {output_path}")
 
 
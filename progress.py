@@ -0,0 +1,184 @@
+"""
+Live progress of a running render, from its log and metrics file.
+
+A render writes two files as it goes: manim's log, with a line per finished
+animation ("Animation 12 : Partial movie file written in ..."), and the
+metrics file (render_metrics.py), where TutorialFileWriter records the
+frames written (or spliced from a cached stinger) so far about once a second and every finished intro,
+section and outro is a part event. RenderProgress tails both: each update
+reads only what was appended since the last one, a chunk at a time, and
+keeps nothing of the files but their offsets and an unfinished last line.
+
+The counters are compared with the render plan (render_plan.py: planned
+frames, animations and parts), giving percent complete, frames per second
+over the last few seconds, and an ETA. Before the first frames arrive the
+ETA comes from the plan's predicted throughput.
+
+Used by the MCP job service (job_progress, wait_for_job) and the GUI's
+progress bar. To follow a render in a terminal:
+    uv run progress.py logs/manim_log_<name>_<timestamp>.txt --script scripts/<name>.json -q l
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import deque
+
+from render_metrics import metrics_file_for
+
+ANIMATION_PATTERN = re.compile(rb"Animation (\d+) :")
+# Lines are split on \r too: progress bars redraw themselves with it
+LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+CHUNK_BYTES = 64 * 1024
+# A "line" longer than this is not one worth parsing, drop it rather than grow
+MAX_LINE_BYTES = 64 * 1024
+# (time, frames) samples the frame rate is measured over
+RATE_SAMPLES = 10
+
+
+class FileTail:
+    """Yields the complete lines appended to a file since the previous call."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.partial = b""
+
+    def lines(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self.offset)
+            while chunk := f.read(CHUNK_BYTES):
+                self.offset += len(chunk)
+                *complete, self.partial = LINE_BREAK.split(self.partial + chunk)
+                if len(self.partial) > MAX_LINE_BYTES:
+                    self.partial = b""
+                yield from complete
+
+
+def plan_totals(script_path: str, quality: str = "l") -> dict | None:
+    """Planned frames, animations and parts of a script, or None if it cannot be planned."""
+    try:
+        from render_plan import plan_script
+
+        plan = plan_script(script_path, quality)
+    except Exception as e:
+        print(f"Could not plan {script_path} for progress reporting: {e}")
+        return None
+    return {
+        "frames": plan["frames"],
+        "animations": sum(event["kind"] in ("play", "wait") for part in plan["parts"] for event in part["events"]),
+        "parts": len(plan["parts"]),
+        "frames_per_second": plan["frames_per_second"],
+    }
+
+
+class RenderProgress:
+    def __init__(self, log_path: str, metrics_path: str | None = None, plan: dict | None = None):
+        self.log = FileTail(log_path)
+        self.metrics = FileTail(metrics_path or metrics_file_for(log_path))
+        self.plan = plan
+        self.lock = threading.Lock()
+        self.animations = 0
+        self.frames = 0
+        self.parts = 0
+        self.finished = False
+        self.samples = deque(maxlen=RATE_SAMPLES)
+
+    def update(self) -> dict:
+        """Reads what the render wrote since the last update and returns the progress."""
+        with self.lock:
+            for line in self.log.lines():
+                match = ANIMATION_PATTERN.search(line)
+                if match:
+                    # Animations are numbered from 0
+                    self.animations = max(self.animations, int(match.group(1)) + 1)
+            for line in self.metrics.lines():
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event["event"] == "progress":
+                    self.frames = max(self.frames, event["frames"])
+                    self.samples.append((event["time"], event["frames"]))
+                elif event["event"] == "part":
+                    self.parts += 1
+                elif event["event"] == "combine":
+                    # The partial movies are joined: the video is written
+                    self.finished = True
+            return self.snapshot()
+
+    def frames_per_second(self) -> float | None:
+        if len(self.samples) < 2:
+            return None
+        (start, first), (end, last) = self.samples[0], self.samples[-1]
+        return (last - first) / (end - start) if end > start else None
+
+    def snapshot(self) -> dict:
+        plan = self.plan or {}
+        fps = self.frames_per_second()
+        percent = None
+        if self.finished:
+            percent = 100.0
+        elif plan.get("frames"):
+            percent = min(100 * self.frames / plan["frames"], 99.9)
+        elif plan.get("parts"):
+            percent = 100 * self.parts / plan["parts"]
+        eta = None
+        rate = fps or plan.get("frames_per_second")
+        if self.finished:
+            eta = 0
+        elif plan.get("frames") and rate:
+            eta = max(plan["frames"] - self.frames, 0) / rate
+        return {
+            "percent": round(percent, 1) if percent is not None else None,
+            "frames": self.frames,
+            "frames_total": plan.get("frames"),
+            "animations": self.animations,
+            "animations_total": plan.get("animations"),
+            "parts_done": self.parts,
+            "parts_total": plan.get("parts"),
+            "frames_per_second": round(fps, 1) if fps else None,
+            "eta_seconds": round(eta) if eta is not None else None,
+            "finished": self.finished,
+        }
+
+
+def describe(progress: dict) -> str:
+    """One line for a status bar: 'part 3/8, 42%, 31.5 frames/s, 1:20 left'."""
+    text = []
+    if progress.get("parts_total"):
+        text.append(f"part {min(progress['parts_done'] + 1, progress['parts_total'])}/{progress['parts_total']}")
+    if progress.get("percent") is not None:
+        text.append(f"{progress['percent']:.0f}%")
+    if progress.get("frames_per_second"):
+        text.append(f"{progress['frames_per_second']:.1f} frames/s")
+    if progress.get("eta_seconds") is not None:
+        minutes, seconds = divmod(progress["eta_seconds"], 60)
+        text.append(f"{minutes}:{seconds:02d} left")
+    return ", ".join(text) or "starting"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Follow the progress of a running render.")
+    parser.add_argument("log", help="The render's manim_log_*.txt")
+    parser.add_argument("--script", default=None, help="Script being rendered, to plan the totals")
+    parser.add_argument("-q", "--quality", default="l", help="Quality flag: l, m or h")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between updates")
+    args = parser.parse_args()
+
+    tracker = RenderProgress(args.log, plan=plan_totals(args.script, args.quality[-1]) if args.script else None)
+    try:
+        while True:
+            progress = tracker.update()
+            print(describe(progress), flush=True)
+            if progress["finished"]:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,167 @@
+"""
+Long-running render daemon for scripts/.
+
+Watches the scripts directory (inotify on Linux, through watchdog, which
+manim already depends on) and queues every JSON script that is created,
+modified or moved in, e.g. by the save_json MCP tool, then renders it with
+the same jobs as wrapper.py.
+
+Files are debounced: a script is only picked up once no write has touched
+it for DEBOUNCE_SECONDS and it parses as JSON, so half-written files are
+never rendered. A rendered script whose content changed is queued again
+(saving it unchanged does nothing); one that is rendering right now is
+checked again once that render finishes.
+
+Scripts saved while the daemon was not running are queued on startup.
+
+Usage:
+    uv run render_daemon.py
+    uv run render_daemon.py -j 2 -q h
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from job_store import RUNNING, get_job_store
+from wrapper import default_jobs, process_job, render_job, worker_name
+
+SCRIPTS_DIR = "scripts"
+# How long a script must stay untouched before it is queued
+DEBOUNCE_SECONDS = 1.0
+# How often pending scripts are checked
+POLL_SECONDS = 0.25
+
+
+class ScriptEvents(FileSystemEventHandler):
+    """Remembers when each JSON script was last written."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def touch(self, path):
+        if path.endswith(".json"):
+            with self.lock:
+                self.pending[os.path.normpath(path)] = time.monotonic()
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.touch(event.src_path)
+
+    def on_moved(self, event):
+        # Editors and atomic writers save through a temporary file and a rename
+        if not event.is_directory:
+            self.touch(event.dest_path)
+
+    def settled(self, debounce):
+        """Removes and returns the scripts nothing has written to for debounce seconds."""
+        now = time.monotonic()
+        with self.lock:
+            ready = [path for path, last_write in self.pending.items() if now - last_write >= debounce]
+            for path in ready:
+                del self.pending[path]
+        return ready
+
+    def retry_later(self, path):
+        with self.lock:
+            self.pending.setdefault(path, time.monotonic())
+
+
+def queue_script(store, events, path):
+    """Queues a settled script if it is new or its content changed. Returns True if it was queued."""
+    if not os.path.exists(path):
+        return False
+    job = store.get(path)
+    if job is not None and job["state"] == RUNNING:
+        # Render it again once the current render is done, if it changed
+        events.retry_later(path)
+        return False
+    change = store.sync_script(path)
+    if change:
+        print(f"Queued {change} script {path}")
+    return change is not None
+
+
+def run_daemon(jobs=None, quality="l", debounce=DEBOUNCE_SECONDS, warm=False):
+    store = get_job_store()
+    store.requeue_stale()
+    added = store.sync_scripts(SCRIPTS_DIR)
+    if added:
+        print(f"Queued {added} scripts saved while the daemon was not running")
+
+    jobs = jobs or default_jobs()
+    render = render_job
+    warm_pool = None
+    if warm:
+        from manim_worker import WarmWorkerPool
+
+        warm_pool = WarmWorkerPool(jobs)
+        render = warm_pool.render
+
+    work_available = threading.Condition()
+    stopping = threading.Event()
+
+    def worker(index):
+        name = worker_name(index)
+        while not stopping.is_set():
+            job = store.claim_next(name)
+            if job is None:
+                with work_available:
+                    work_available.wait(timeout=5)
+                continue
+            try:
+                process_job(store, job, quality, render)
+            except FileNotFoundError:
+                print("Error: 'manim' command not found. Make sure Manim is installed and in your PATH.")
+                stopping.set()
+
+    events = ScriptEvents()
+    observer = Observer()
+    observer.schedule(events, SCRIPTS_DIR, recursive=False)
+    observer.start()
+
+    workers = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(jobs)]
+    for thread in workers:
+        thread.start()
+    print(f"Watching {SCRIPTS_DIR}/ with {jobs} render workers at -q{quality}. Ctrl+C to stop.")
+
+    try:
+        while not stopping.is_set():
+            queued = [path for path in events.settled(debounce) if queue_script(store, events, path)]
+            if queued:
+                with work_available:
+                    work_available.notify_all()
+            time.sleep(POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("Stopping after the renders in progress...")
+    stopping.set()
+    with work_available:
+        work_available.notify_all()
+    observer.stop()
+    observer.join()
+    for thread in workers:
+        thread.join()
+    if warm_pool:
+        warm_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch scripts/ and render new or changed scripts.")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=0, help="Parallel renders (default: as many as CPU and memory allow)"
+    )
+    parser.add_argument("-q", "--quality", default="l", help="Quality flag: l, m or h")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS, help="Seconds a script must stay unchanged")
+    parser.add_argument("--warm", action="store_true", help="Render in long-lived worker processes instead of one manim per script")
+    args = parser.parse_args()
+    os.makedirs(SCRIPTS_DIR, exist_ok=True)
+    run_daemon(args.jobs or None, args.quality[-1], args.debounce, args.warm)
@@ -0,0 +1,655 @@
+"""
+Render farm: one coordinator hands work to render workers over HTTP.
+
+The coordinator plans every script it is given (or every queued job in the
+job store) into tasks and serves them to workers on any number of machines:
+
+    section   (default) one task per part: the intro, each section with its
+              transition, and the outro, rendered by main.SectionVideo like
+              section_cache.py. The coordinator stitches the parts.
+    script    one task per script, rendered whole by main.Video.
+
+Tasks are content-addressed. A task's key is section_cache.part_key (or the
+job store's render key for whole scripts), so identical sections of
+different scripts are rendered once, and parts already in the section cache
+are never handed out. Workers upload the finished movie to
+PUT /artifacts/<key> with the sha256 of the file; the coordinator only
+stores an upload whose bytes match that hash. Workers check that their
+main.py, voice and manim produce the same key before rendering, so a node
+with different code fails the task instead of uploading a wrong movie.
+
+Workers send a heartbeat every HEARTBEAT_SECONDS while they render. A worker
+not heard from for WORKER_TIMEOUT seconds is considered dead and its task is
+handed to another worker, and so is a task whose worker moved on without
+delivering it (its upload failed or was rejected); a task that fails
+MAX_ATTEMPTS times fails its videos. The coordinator stops once every video is stitched or failed, and
+idle workers exit when it reports that it is finished.
+
+Endpoints (JSON): POST /claim, POST /heartbeat, POST /fail,
+PUT /artifacts/<key>, GET /status.
+
+Usage:
+    uv run render_farm.py coordinator scripts/a.json scripts/b.json -q l --host 0.0.0.0
+    uv run render_farm.py worker --coordinator http://10.0.0.5:8765
+    uv run render_farm.py local scripts/a.json -w 3     # coordinator and 3 workers on this machine
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from job_store import data_hash, get_job_store, render_key
+from scheduler import BATCH, acquire, encoder_threads
+from section_cache import PARTS_DIR, VIDEO_DIR, concat_movies, part_key, part_name, quality_settings, script_parts
+
+ARTIFACTS_DIR = os.path.join("media", "farm", "artifacts")
+DEFAULT_PORT = 8765
+HEARTBEAT_SECONDS = 5
+# A worker not heard from for this long is dead and loses its task
+WORKER_TIMEOUT = 20
+MAX_ATTEMPTS = 3
+# How long an idle worker waits before asking for work again
+POLL_SECONDS = 1
+# How long the coordinator keeps answering after the last video, so workers learn it is finished
+LINGER_SECONDS = 3
+
+PENDING = "pending"
+ASSIGNED = "assigned"
+DONE = "done"
+FAILED = "failed"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Coordinator:
+    """The farm's tasks, videos and workers. All state is guarded by one lock."""
+
+    def __init__(self, quality: str = "l", unit: str = "section"):
+        self.quality = quality
+        self.unit = unit
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.videos = []
+        self.workers = {}
+        self.finished = threading.Event()
+
+    def artifact_path(self, key: str) -> str:
+        # Section parts share the section cache, so later cached renders reuse them
+        directory = PARTS_DIR if self.unit == "section" else ARTIFACTS_DIR
+        return os.path.join(directory, f"{key}.mp4")
+
+    def add_script(self, script_path: str, job_id: int | None = None) -> None:
+        from generate_voice import get_voice
+        from section_cache import style_fingerprint
+
+        with open(script_path, "r", encoding="utf-8") as f:
+            tutorial_data = json.load(f)
+        name = os.path.splitext(os.path.basename(script_path))[0]
+        settings = quality_settings(self.quality)
+        resolution = f"{settings['pixel_height']}p{settings['frame_rate']}"
+        video = {
+            "script": script_path,
+            "name": name,
+            "job_id": job_id,
+            "content_hash": data_hash(tutorial_data),
+            "output": os.path.join(VIDEO_DIR, resolution, f"{name}.mp4"),
+            "keys": [],
+            "state": PENDING,
+        }
+        if self.unit == "section":
+            voice, style = get_voice(), style_fingerprint()
+            parts = [(part, part_key(tutorial_data, part, self.quality, voice, style)) for part in script_parts(tutorial_data)]
+        else:
+            parts = [(None, render_key(video["content_hash"], self.quality))]
+        if not parts:
+            raise ValueError(f"{script_path} has nothing to render")
+
+        with self.lock:
+            for part, key in parts:
+                video["keys"].append(key)
+                if key in self.tasks:
+                    continue
+                self.tasks[key] = {
+                    "key": key,
+                    "label": f"{name}:{part_name(part)}" if part is not None else name,
+                    "part": part,
+                    "tutorial_data": tutorial_data,
+                    "state": DONE if os.path.exists(self.artifact_path(key)) else PENDING,
+                    "worker": None,
+                    "attempts": 0,
+                    "error": None,
+                }
+            self.videos.append(video)
+        cached = sum(self.tasks[key]["state"] == DONE for key in video["keys"])
+        print(f"Planned {script_path}: {len(video['keys'])} tasks, {cached} already rendered")
+
+    def seen(self, worker: str) -> None:
+        self.workers.setdefault(worker, {"task": None, "done": 0})["last_seen"] = time.monotonic()
+
+    def claim(self, worker: str) -> dict:
+        with self.lock:
+            self.seen(worker)
+            # A worker asking for work is not working on anything else
+            self.workers[worker]["task"] = None
+            released = self._release_dropped()
+            reply = self._assign(worker)
+        if released:
+            # Requeueing may have failed a task for good
+            self.check_videos()
+        return reply
+
+    def _assign(self, worker: str) -> dict:
+        for task in self.tasks.values():
+            if task["state"] == PENDING:
+                task.update(state=ASSIGNED, worker=worker, attempts=task["attempts"] + 1)
+                self.workers[worker]["task"] = task["key"]
+                print(f"Assigned {task['label']} to {worker} (attempt {task['attempts']})")
+                return {
+                    "task": {
+                        "key": task["key"],
+                        "label": task["label"],
+                        "part": task["part"],
+                        "quality": self.quality,
+                        "unit": self.unit,
+                        "tutorial_data": task["tutorial_data"],
+                    },
+                    "finished": False,
+                }
+        return {"task": None, "finished": self.finished.is_set()}
+
+    def heartbeat(self, worker: str, key: str | None) -> dict:
+        with self.lock:
+            self.seen(worker)
+            task = self.tasks.get(key)
+            # False tells the worker its task was given to someone else (it may still upload it)
+            return {"assigned": bool(task and task["state"] == ASSIGNED and task["worker"] == worker)}
+
+    def fail(self, worker: str, key: str, error: str) -> dict:
+        with self.lock:
+            self.seen(worker)
+            self.workers[worker]["task"] = None
+            task = self.tasks.get(key)
+            if task is None or task["state"] != ASSIGNED or task["worker"] != worker:
+                return {"ok": True}
+            print(f"{worker} failed {task['label']}: {error}")
+            self._requeue(task, error)
+        self.check_videos()
+        return {"ok": True}
+
+    def _release_dropped(self) -> bool:
+        """Requeues assigned tasks that their worker no longer holds. Call with the lock held."""
+        requeued = False
+        for task in self.tasks.values():
+            if task["state"] != ASSIGNED:
+                continue
+            info = self.workers.get(task["worker"])
+            if info is None or info["task"] != task["key"]:
+                print(f"{task['worker']} dropped {task['label']}, reassigning it")
+                self._requeue(task, f"worker {task['worker']} did not deliver it")
+                requeued = True
+        return requeued
+
+    def _requeue(self, task: dict, error: str) -> None:
+        task.update(worker=None, error=error)
+        task["state"] = PENDING if task["attempts"] < MAX_ATTEMPTS else FAILED
+
+    def store_artifact(self, worker: str, key: str, expected_sha256: str, stream, length: int) -> dict:
+        """Saves an uploaded movie if its bytes match expected_sha256."""
+        with self.lock:
+            self.seen(worker)
+            task = self.tasks.get(key)
+        path = self.artifact_path(key)
+        if task is None:
+            raise KeyError(key)
+        if task["state"] == DONE and os.path.exists(path):
+            # Content-addressed: a copy from another worker is already here
+            _drain(stream, length)
+            self.release_worker(worker, key)
+            return {"stored": False}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = hashlib.sha256()
+        temp_path = f"{path}.{threading.get_ident()}.upload"
+        with open(temp_path, "wb") as f:
+            remaining = length
+            while remaining:
+                chunk = stream.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                remaining -= len(chunk)
+        if remaining or digest.hexdigest() != expected_sha256:
+            os.remove(temp_path)
+            # The task is requeued by the worker's /fail, or else by the next claim
+            self.release_worker(worker, key)
+            raise ValueError(f"Upload of {key} is incomplete or does not match its sha256")
+        os.replace(temp_path, path)
+
+        with self.lock:
+            task.update(state=DONE, worker=worker, error=None)
+            self.workers[worker]["done"] += 1
+            if self.workers[worker]["task"] == key:
+                self.workers[worker]["task"] = None
+        print(f"Stored {task['label']} from {worker}")
+        self.check_videos()
+        return {"stored": True}
+
+    def release_worker(self, worker: str, key: str) -> None:
+        """The worker is done with key, whether or not it delivered it."""
+        with self.lock:
+            if self.workers[worker]["task"] == key:
+                self.workers[worker]["task"] = None
+
+    def reap(self) -> None:
+        """Hands the tasks of workers that stopped sending heartbeats to other workers."""
+        now = time.monotonic()
+        requeued = False
+        with self.lock:
+            for worker, info in self.workers.items():
+                task = self.tasks.get(info["task"])
+                if now - info["last_seen"] < WORKER_TIMEOUT or task is None:
+                    continue
+                if task["state"] == ASSIGNED and task["worker"] == worker:
+                    print(f"{worker} stopped responding, reassigning {task['label']}")
+                    self._requeue(task, f"worker {worker} stopped responding")
+                    requeued = True
+                info["task"] = None
+            requeued = self._release_dropped() or requeued
+        if requeued:
+            self.check_videos()
+
+    def check_videos(self) -> None:
+        """Stitches every video whose tasks are all done and fails those with a failed task."""
+        ready = []
+        with self.lock:
+            for video in self.videos:
+                if video["state"] != PENDING:
+                    continue
+                states = [self.tasks[key]["state"] for key in video["keys"]]
+                if FAILED in states:
+                    video["state"] = FAILED
+                    error = next(self.tasks[key]["error"] for key in video["keys"] if self.tasks[key]["state"] == FAILED)
+                    print(f"{video['script']} failed: {error}")
+                    if video["job_id"] is not None:
+                        get_job_store().fail(video["job_id"], error)
+                elif all(state == DONE for state in states):
+                    # Claimed here so only one thread stitches it
+                    video["state"] = ASSIGNED
+                    ready.append(video)
+        for video in ready:
+            self.stitch(video)
+        with self.lock:
+            if all(video["state"] in (DONE, FAILED) for video in self.videos):
+                self.finished.set()
+
+    def stitch(self, video: dict) -> None:
+        movies = [self.artifact_path(key) for key in video["keys"]]
+        try:
+            if self.unit == "section":
+                concat_movies(movies, video["output"])
+            else:
+                os.makedirs(os.path.dirname(video["output"]), exist_ok=True)
+                shutil.copyfile(movies[0], video["output"])
+        except Exception as e:
+            state, error = FAILED, f"stitching failed: {e}"
+        else:
+            state, error = DONE, None
+        with self.lock:
+            video["state"] = state
+        if state == DONE:
+            print(f"Video: {video['output']}")
+        else:
+            print(f"{video['script']} {error}")
+        if video["job_id"] is not None:
+            store = get_job_store()
+            if state == DONE:
+                key = render_key(video["content_hash"], self.quality)
+                store.finish(video["job_id"], video["output"], None, key, video["content_hash"])
+            else:
+                store.fail(video["job_id"], error)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self.lock:
+            counts = {}
+            for task in self.tasks.values():
+                counts[task["state"]] = counts.get(task["state"], 0) + 1
+            return {
+                "quality": self.quality,
+                "unit": self.unit,
+                "tasks": counts,
+                "videos": [{"script": v["script"], "state": v["state"], "output": v["output"]} for v in self.videos],
+                "workers": {
+                    name: {
+                        "seconds_since_seen": round(now - info["last_seen"], 1),
+                        "alive": now - info["last_seen"] < WORKER_TIMEOUT,
+                        "task": self.tasks[info["task"]]["label"] if info["task"] in self.tasks else None,
+                        "done": info["done"],
+                    }
+                    for name, info in self.workers.items()
+                },
+                "finished": self.finished.is_set(),
+            }
+
+
+def _drain(stream, length: int) -> None:
+    while length > 0:
+        chunk = stream.read(min(length, 1 << 20))
+        if not chunk:
+            break
+        length -= len(chunk)
+
+
+def make_handler(coordinator: Coordinator):
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status: int, body: dict) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/status":
+                self.reply(200, coordinator.status())
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            worker = body.get("worker", self.client_address[0])
+            if self.path == "/claim":
+                self.reply(200, coordinator.claim(worker))
+            elif self.path == "/heartbeat":
+                self.reply(200, coordinator.heartbeat(worker, body.get("key")))
+            elif self.path == "/fail":
+                self.reply(200, coordinator.fail(worker, body["key"], body.get("error", "unknown error")))
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def do_PUT(self):
+            prefix = "/artifacts/"
+            if not self.path.startswith(prefix):
+                self.reply(404, {"error": "not found"})
+                return
+            key = self.path[len(prefix):]
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                result = coordinator.store_artifact(
+                    self.headers.get("X-Worker", self.client_address[0]),
+                    key,
+                    self.headers.get("X-Content-SHA256", ""),
+                    self.rfile,
+                    length,
+                )
+            except KeyError:
+                self.reply(404, {"error": f"unknown task {key}"})
+            except ValueError as e:
+                self.reply(400, {"error": str(e)})
+            else:
+                self.reply(200, result)
+
+        def log_message(self, format, *args):
+            # Requests are frequent (heartbeats); the coordinator prints what matters itself
+            pass
+
+    return Handler
+
+
+def run_coordinator(scripts: list, quality: str = "l", unit: str = "section", host: str = "127.0.0.1", port: int = DEFAULT_PORT, ready=None) -> list:
+    """
+    Serves scripts (or, without any, every queued job in the job store) to
+    workers until each video is stitched or failed. Returns the videos.
+    """
+    coordinator = Coordinator(quality, unit)
+    if scripts:
+        for script in scripts:
+            coordinator.add_script(script)
+    else:
+        store = get_job_store()
+        store.requeue_stale()
+        store.sync_scripts("scripts")
+        while True:
+            job = store.claim_next(f"farm:{host}:{port}")
+            if job is None:
+                break
+            try:
+                coordinator.add_script(job["script"], job["id"])
+            except Exception as e:
+                store.fail(job["id"], str(e))
+    if not coordinator.videos:
+        print("Nothing to render.")
+        return []
+    coordinator.check_videos()
+
+    server = ThreadingHTTPServer((host, port), make_handler(coordinator))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Coordinator listening on http://{host}:{server.server_address[1]} ({unit} tasks at -q{quality})")
+    if ready:
+        ready.set()
+    try:
+        while not coordinator.finished.wait(HEARTBEAT_SECONDS):
+            coordinator.reap()
+        time.sleep(LINGER_SECONDS)
+    except KeyboardInterrupt:
+        print("Stopping the coordinator")
+        # Jobs claimed from the job store go back to the queue instead of waiting out the stale timeout
+        store = get_job_store()
+        for video in coordinator.videos:
+            if video["job_id"] is not None and video["state"] not in (DONE, FAILED) and store.release(video["job_id"]):
+                print(f"Queued {video['script']} again")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    done = sum(video["state"] == DONE for video in coordinator.videos)
+    print(f"{done} of {len(coordinator.videos)} videos finished")
+    return coordinator.videos
+
+
+def call(coordinator_url: str, path: str, body: dict) -> dict:
+    request = urllib.request.Request(
+        coordinator_url.rstrip("/") + path,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)
+
+
+def report_failure(coordinator_url: str, worker: str, key: str, error: str) -> None:
+    """Tells the coordinator a task failed; if it cannot be reached, it requeues the task on its own."""
+    try:
+        call(coordinator_url, "/fail", {"worker": worker, "key": key, "error": error})
+    except OSError:
+        pass
+
+
+def upload(coordinator_url: str, worker: str, key: str, path: str) -> dict:
+    with open(path, "rb") as f:
+        request = urllib.request.Request(
+            f"{coordinator_url.rstrip('/')}/artifacts/{key}",
+            data=f,
+            headers={
+                "Content-Length": str(os.path.getsize(path)),
+                "Content-Type": "video/mp4",
+                "X-Content-SHA256": file_sha256(path),
+                "X-Worker": worker,
+            },
+            method="PUT",
+        )
+        with urllib.request.urlopen(request, timeout=300) as response:
+            return json.load(response)
+
+
+def render_whole(tutorial_data: dict, quality: str, output_path: str) -> str:
+    """Renders a whole script with main.Video and moves the movie to output_path."""
+    from manim import tempconfig
+
+    from main import Video
+
+    with tempfile.TemporaryDirectory(prefix="farm_") as media_dir:
+        settings = quality_settings(quality)
+        settings.update({"media_dir": media_dir, "output_file": "video", "disable_caching": True})
+        with tempconfig(settings):
+            scene = Video(tutorial_data=tutorial_data)
+            scene.render()
+            shutil.move(str(scene.renderer.file_writer.movie_file_path), output_path)
+    return output_path
+
+
+def render_task(task: dict, output_path: str) -> str:
+    """Renders a task after checking that this node computes the same key as the coordinator."""
+    from generate_voice import get_voice
+    from section_cache import render_part, style_fingerprint
+
+    tutorial_data, quality = task["tutorial_data"], task["quality"]
+    if task["unit"] == "section":
+        key = part_key(tutorial_data, task["part"], quality, get_voice(), style_fingerprint())
+    else:
+        key = render_key(data_hash(tutorial_data), quality)
+    if key != task["key"]:
+        raise RuntimeError("this worker's main.py, voice or manim differ from the coordinator's")
+
+    if task["unit"] == "section":
+        # Takes its own scheduler lease
+        return render_part(tutorial_data, task["part"], quality, output_path)
+    with acquire("manim", BATCH, task["label"]) as lease, encoder_threads(lease.threads):
+        return render_whole(tutorial_data, quality, output_path)
+
+
+def run_worker(coordinator_url: str, name: str | None = None) -> int:
+    """Renders tasks from the coordinator until it is finished. Returns the number of tasks uploaded."""
+    from wrapper import worker_name
+
+    name = name or worker_name(0)
+    workdir = tempfile.mkdtemp(prefix="farm_worker_")
+    uploaded = 0
+    failures = 0
+    try:
+        while True:
+            try:
+                reply = call(coordinator_url, "/claim", {"worker": name})
+            # URLError, HTTPError and read timeouts are all OSErrors
+            except OSError as e:
+                failures += 1
+                if failures > WORKER_TIMEOUT // POLL_SECONDS:
+                    print(f"{name}: coordinator unreachable ({e}), stopping")
+                    return uploaded
+                time.sleep(POLL_SECONDS)
+                continue
+            failures = 0
+            if reply["finished"]:
+                return uploaded
+            task = reply["task"]
+            if task is None:
+                time.sleep(POLL_SECONDS)
+                continue
+
+            print(f"{name}: rendering {task['label']}")
+            stop = threading.Event()
+
+            def beat():
+                while not stop.wait(HEARTBEAT_SECONDS):
+                    try:
+                        if not call(coordinator_url, "/heartbeat", {"worker": name, "key": task["key"]})["assigned"]:
+                            print(f"{name}: {task['label']} was reassigned, finishing it anyway")
+                    except OSError:
+                        pass
+
+            heartbeat = threading.Thread(target=beat, daemon=True)
+            heartbeat.start()
+            output_path = os.path.join(workdir, f"{task['key']}.mp4")
+            try:
+                render_task(task, output_path)
+            except Exception as e:
+                print(f"{name}: {task['label']} failed: {e}")
+                report_failure(coordinator_url, name, task["key"], str(e))
+                continue
+            finally:
+                stop.set()
+                heartbeat.join()
+            try:
+                upload(coordinator_url, name, task["key"], output_path)
+                uploaded += 1
+            except OSError as e:
+                # Includes a rejected upload (HTTP 400); the task goes back to the queue
+                print(f"{name}: upload of {task['label']} failed: {e}")
+                report_failure(coordinator_url, name, task["key"], f"upload failed: {e}")
+            finally:
+                os.remove(output_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_local(scripts: list, workers: int, quality: str = "l", unit: str = "section", port: int = DEFAULT_PORT) -> list:
+    """Runs a coordinator and workers worker processes on this machine."""
+    ready = threading.Event()
+    result = {}
+
+    def coordinate():
+        result["videos"] = run_coordinator(scripts, quality, unit, "127.0.0.1", port, ready)
+
+    thread = threading.Thread(target=coordinate)
+    thread.start()
+    processes = []
+    if ready.wait(timeout=600):
+        url = f"http://127.0.0.1:{port}"
+        processes = [
+            subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", "--coordinator", url, "--name", f"local-{index}"])
+            for index in range(workers)
+        ]
+    thread.join()
+    for process in processes:
+        try:
+            process.wait(timeout=LINGER_SECONDS + POLL_SECONDS * 2)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+    return result.get("videos", [])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render scripts on several worker nodes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for command in ("coordinator", "local"):
+        sub = commands.add_parser(command)
+        sub.add_argument("scripts", nargs="*", help="JSON scripts (default: every queued job in the job store)")
+        sub.add_argument("-q", "--quality", default="l", help="Quality flag: l, m or h")
+        sub.add_argument("--unit", choices=("section", "script"), default="section", help="Hand out sections or whole scripts")
+        sub.add_argument("--port", type=int, default=DEFAULT_PORT)
+    commands.choices["coordinator"].add_argument("--host", default="127.0.0.1", help="Use 0.0.0.0 to accept workers from other machines")
+    commands.choices["local"].add_argument("-w", "--workers", type=int, default=2, help="Worker processes to start")
+
+    worker_parser = commands.add_parser("worker")
+    worker_parser.add_argument("--coordinator", default=f"http://127.0.0.1:{DEFAULT_PORT}", help="Coordinator URL")
+    worker_parser.add_argument("--name", default=None, help="Worker name (default: host:pid)")
+
+    args = parser.parse_args()
+    if args.command == "coordinator":
+        run_coordinator(args.scripts, args.quality[-1], args.unit, args.host, args.port)
+    elif args.command == "local":
+        run_local(args.scripts, args.workers, args.quality[-1], args.unit, args.port)
+    else:
+        count = run_worker(args.coordinator, args.name)
+        print(f"{args.name or 'worker'} uploaded {count} tasks")
@@ -0,0 +1,197 @@
+"""
+Per-stage render metrics as JSON lines.
+
+When MANIM_METRICS_FILE is set (wrapper.py sets it to a
+logs/manim_metrics_*.jsonl file next to the manim_log_*.txt it writes), a
+render appends one JSON object per line:
+
+    tts      one voiceover: latency, cache hit or miss
+    prefetch synthesizing all of a scene's voiceovers before construct
+    part     intro, each section (with its transition) or outro: wall time,
+             frames written and how that time splits into TTS, Code/Paragraph
+             layout, frame encoding and rasterization (the rest)
+    progress frames written so far, about once a second while rendering
+             (followed live by progress.py)
+    combine  joining the partial movies (and muxing the narration)
+    render   the whole scene: wall time, frames, peak RSS
+
+Every line has the event name, a timestamp, the process id and the peak RSS
+so far. Without the variable nothing is written; the counters are cheap.
+
+Summary of a batch:
+    uv run render_metrics.py logs/manim_metrics_*.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FILE_ENV = "MANIM_METRICS_FILE"
+
+# Running totals, parts record the difference over their duration
+_totals = defaultdict(float)
+
+
+def metrics_file_for(log_filename: str) -> str:
+    """logs/manim_log_<name>.txt -> logs/manim_metrics_<name>.jsonl"""
+    directory, name = os.path.split(log_filename)
+    stem = os.path.splitext(name)[0].replace("manim_log_", "manim_metrics_", 1)
+    return os.path.join(directory, f"{stem}.jsonl")
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes everywhere else
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def add(name: str, amount: float = 1) -> None:
+    _totals[name] += amount
+
+
+def totals() -> dict:
+    return dict(_totals)
+
+
+def record(event: str, **fields) -> None:
+    """Appends one event to the metrics file, if there is one."""
+    path = os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return
+    entry = {"event": event, "time": time.time(), "pid": os.getpid(), **fields, "peak_rss_mb": peak_rss_mb()}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # One short write per line, safe with the concurrent TTS coroutines
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+@contextmanager
+def part(name: str, kind: str):
+    """Records a part of the video with the stage totals that accrued during it."""
+    before = totals()
+    started = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - started
+    delta = {key: value - before.get(key, 0) for key, value in totals().items()}
+    stages = {stage: delta.get(f"{stage}_seconds", 0.0) for stage in ("tts", "layout", "encode")}
+    record(
+        "part",
+        part=name,
+        type=kind,
+        seconds=seconds,
+        frames=int(delta.get("frames", 0)),
+        tts_seconds=stages["tts"],
+        layout_seconds=stages["layout"],
+        encode_seconds=stages["encode"],
+        rasterize_seconds=max(seconds - sum(stages.values()), 0.0),
+        layout_hits=int(delta.get("layout_hits", 0)),
+        layout_misses=int(delta.get("layout_misses", 0)),
+    )
+
+
+def read_events(paths: list[str]) -> list[dict]:
+    events = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append({**json.loads(line), "file": path})
+                except json.JSONDecodeError:
+                    # A render killed mid-write leaves a partial last line
+                    continue
+    return events
+
+
+def summarize(paths: list[str]) -> dict:
+    """Combines the metrics files of a batch of renders."""
+    events = read_events(paths)
+    tts = [event for event in events if event["event"] == "tts"]
+    hits = [event for event in tts if event.get("hit")]
+    misses = [event for event in tts if not event.get("hit")]
+    parts = [event for event in events if event["event"] == "part"]
+    renders = [event for event in events if event["event"] == "render"]
+    combines = [event for event in events if event["event"] == "combine"]
+    prefetches = [event for event in events if event["event"] == "prefetch"]
+
+    by_type = {}
+    for event in parts:
+        entry = by_type.setdefault(event["type"], {"count": 0, "seconds": 0.0, "frames": 0})
+        entry["count"] += 1
+        entry["seconds"] += event["seconds"]
+        entry["frames"] += event["frames"]
+
+    stage_seconds = {
+        "tts": sum(event["seconds"] for event in prefetches) + sum(event.get("tts_seconds", 0) for event in parts),
+        "layout": sum(event.get("layout_seconds", 0) for event in parts),
+        "rasterize": sum(event.get("rasterize_seconds", 0) for event in parts),
+        "encode": sum(event.get("encode_seconds", 0) for event in parts),
+        "combine": sum(event["seconds"] for event in combines),
+    }
+    render_seconds = sum(event["seconds"] for event in renders) + stage_seconds["combine"]
+    frames = sum(event.get("frames", 0) for event in renders)
+    peaks = [event["peak_rss_mb"] for event in events if event.get("peak_rss_mb") is not None]
+    return {
+        "files": len(paths),
+        "renders": len(renders),
+        "render_seconds": render_seconds,
+        "frames": frames,
+        "frames_per_second": frames / render_seconds if render_seconds else 0.0,
+        "stage_seconds": stage_seconds,
+        "parts": by_type,
+        "tts_requests": len(tts),
+        "tts_hits": len(hits),
+        "tts_mean_miss_seconds": sum(event["seconds"] for event in misses) / len(misses) if misses else 0.0,
+        "peak_rss_mb": max(peaks) if peaks else None,
+    }
+
+
+def print_summary(summary: dict) -> None:
+    print(f"{summary['renders']} renders from {summary['files']} metrics files")
+    print(
+        f"  total: {summary['render_seconds']:.1f}s, {summary['frames']} frames, "
+        f"{summary['frames_per_second']:.1f} frames/s"
+    )
+    staged = sum(summary["stage_seconds"].values()) or 1
+    for stage, seconds in summary["stage_seconds"].items():
+        print(f"  {stage:<10} {seconds:8.1f}s  {100 * seconds / staged:5.1f}%")
+    for kind, entry in sorted(summary["parts"].items()):
+        print(
+            f"  {kind:<10} {entry['count']:4d} parts  {entry['seconds'] / entry['count']:6.1f}s each  "
+            f"{entry['frames']} frames"
+        )
+    if summary["tts_requests"]:
+        print(
+            f"  voiceovers: {summary['tts_requests']} ({summary['tts_hits']} cached), "
+            f"{summary['tts_mean_miss_seconds']:.2f}s per synthesized clip"
+        )
+    if summary["peak_rss_mb"] is not None:
+        print(f"  peak RSS: {summary['peak_rss_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize render metrics.")
+    parser.add_argument("files", nargs="+", help="manim_metrics_*.jsonl files")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = summarize(args.files)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
@@ -0,0 +1,222 @@
+"""
+Dry-run timeline planner for main.Video.
+
+Runs the real Video.construct (same section dispatch, same animations and
+waits) in manim's dry-run mode with play() and add_sound() recording a
+timeline instead of rendering. Voiceovers are not synthesized: durations
+come from the voiceover cache when the line has been spoken before and are
+estimated from the word count otherwise.
+
+The plan lists every part (intro, sections with their transition, outro)
+with its animations, waits and narration cues, the total frame count at the
+chosen quality and a predicted render time based on the throughput of past
+renders (logs/render_throughput.json, updated by every Video render).
+
+Usage:
+    uv run render_plan.py scripts/SeleniumBasics1.json -q h
+    uv run render_plan.py scripts/*.json --json
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+
+from manim import Wait, config, tempconfig
+
+from generate_voice import estimate_duration, get_voice_cache, voiceover_key
+from main import Video, section_narration
+from section_cache import quality_settings
+
+THROUGHPUT_FILE = os.path.join("logs", "render_throughput.json")
+# Rough frames/second until a render at that resolution has been recorded
+DEFAULT_FRAMES_PER_SECOND = {480: 60.0, 720: 25.0, 1080: 12.0, 1440: 6.0, 2160: 3.0}
+# manim's config is process-global, so threads (the MCP job service) plan one script at a time
+PLAN_LOCK = threading.Lock()
+
+
+def resolution_label(pixel_height: int, frame_rate: float) -> str:
+    return f"{pixel_height}p{frame_rate:g}"
+
+
+def load_throughput() -> dict:
+    if not os.path.exists(THROUGHPUT_FILE):
+        return {}
+    try:
+        with open(THROUGHPUT_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def record_throughput(pixel_height: int, frame_rate: float, frames: int, seconds: float) -> None:
+    """Adds a finished render to the throughput history used for predictions."""
+    if frames <= 0 or seconds <= 0:
+        return
+    history = load_throughput()
+    entry = history.setdefault(resolution_label(pixel_height, frame_rate), {"frames": 0, "seconds": 0.0, "renders": 0})
+    entry["frames"] += frames
+    entry["seconds"] += seconds
+    entry["renders"] += 1
+    os.makedirs(os.path.dirname(THROUGHPUT_FILE), exist_ok=True)
+    temp_path = f"{THROUGHPUT_FILE}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(temp_path, THROUGHPUT_FILE)
+
+
+def frames_per_second(pixel_height: int, frame_rate: float) -> float:
+    entry = load_throughput().get(resolution_label(pixel_height, frame_rate))
+    if entry and entry["seconds"] > 0:
+        return entry["frames"] / entry["seconds"]
+    closest = min(DEFAULT_FRAMES_PER_SECOND, key=lambda height: abs(height - pixel_height))
+    return DEFAULT_FRAMES_PER_SECOND[closest]
+
+
+class PlanningVideo(Video):
+    """Video that records its timeline instead of rendering it."""
+
+    def __init__(self, tutorial_data=None, **kwargs):
+        super().__init__(tutorial_data=tutorial_data, **kwargs)
+        self.parts = []
+        self.current_part = None
+        self.section_index = 0
+        # sound file -> (text, "cached" or "estimated")
+        self.narration_info = {}
+
+    def setup(self):
+        cache = get_voice_cache()
+        for section in self.narrated_sections():
+            for text in section_narration(section):
+                key = voiceover_key(text)
+                duration = cache.peek(key)
+                source = "cached"
+                if duration is None:
+                    duration = estimate_duration(text)
+                    source = "estimated"
+                # The path does not need to exist, the plan only records it
+                self.narration[text] = (cache.path(key), duration)
+                self.narration_info[cache.path(key)] = (text, source)
+
+    def begin_part(self, name, kind):
+        self.current_part = {"part": name, "type": kind, "start": self.time, "frames": 0, "events": []}
+        self.parts.append(self.current_part)
+
+    def end_part(self):
+        part = self.current_part
+        part["duration"] = self.time - part["start"]
+
+    def show_intro(self, text):
+        if text:
+            self.begin_part("intro", "intro")
+            super().show_intro(text)
+            self.end_part()
+
+    def show_section(self, section):
+        self.begin_part(f"section-{self.section_index:02d}", section.get("type", "code"))
+        self.section_index += 1
+        super().show_section(section)
+
+    def animate_section_transition(self):
+        super().animate_section_transition()
+        self.end_part()
+
+    def show_outro(self, text):
+        if text:
+            self.begin_part("outro", "outro")
+            super().show_outro(text)
+            self.end_part()
+
+    def play(self, *args, **kwargs):
+        self.compile_animation_data(*args, **kwargs)
+        duration = self.duration
+        step = 1 / config.frame_rate
+        is_wait = len(self.animations) == 1 and isinstance(self.animations[0], Wait)
+        # Decided the way CairoRenderer.play does: should_update_mobjects()
+        # settles is_static_wait, which is None until it is called
+        if is_wait and not self.should_update_mobjects() and self.is_current_animation_frozen_frame():
+            # Frozen frames, see CairoRenderer.freeze_current_frame
+            frames = int(duration / step)
+        else:
+            frames = math.ceil(duration / step)
+        description = "Wait" if is_wait else ", ".join(str(animation) for animation in self.animations)
+        self.current_part["events"].append(
+            {
+                "kind": "wait" if is_wait else "play",
+                "description": description[:80],
+                "start": self.time,
+                "duration": frames * step,
+                "frames": frames,
+            }
+        )
+        self.current_part["frames"] += frames
+        self.renderer.num_plays += 1
+        self.renderer.time += frames * step
+
+    def add_sound(self, sound_file, time_offset=0, gain=None, **kwargs):
+        text, source = self.narration_info.get(sound_file, ("", "cached"))
+        self.current_part["events"].append(
+            {
+                "kind": "sound",
+                "description": text[:80],
+                "start": self.time + time_offset,
+                "duration": self.narration[text][1] if text else 0,
+                "file": sound_file,
+                "source": source,
+            }
+        )
+
+
+def plan_script(script_path: str, quality: str = "l") -> dict:
+    """Compiles a script into a timeline without rendering anything. Safe to call from several threads."""
+    with open(script_path, "r") as f:
+        tutorial_data = json.load(f)
+
+    settings = quality_settings(quality)
+    with PLAN_LOCK, tempconfig({**settings, "dry_run": True}):
+        scene = PlanningVideo(tutorial_data=tutorial_data)
+        scene.setup()
+        scene.construct()
+
+    frames = sum(part["frames"] for part in scene.parts)
+    throughput = frames_per_second(settings["pixel_height"], settings["frame_rate"])
+    return {
+        "script": script_path,
+        "quality": quality,
+        "resolution": resolution_label(settings["pixel_height"], settings["frame_rate"]),
+        "duration": scene.time,
+        "frames": frames,
+        "frames_per_second": throughput,
+        "predicted_render_seconds": frames / throughput,
+        "parts": scene.parts,
+    }
+
+
+def print_plan(plan: dict) -> None:
+    print(f"{plan['script']} @ {plan['resolution']}")
+    for part in plan["parts"]:
+        print(f"  {part['part']:<12} {part['type']:<10} {part['start']:7.1f}s  {part['duration']:6.1f}s  {part['frames']:6d} frames")
+        for event in part["events"]:
+            marker = "~" if event.get("source") == "estimated" else " "
+            print(f"      {event['kind']:<5} {event['duration']:5.1f}s{marker} {event['description']}")
+    print(
+        f"  total: {plan['duration']:.1f}s, {plan['frames']} frames, "
+        f"~{plan['predicted_render_seconds']:.0f}s to render at {plan['frames_per_second']:.1f} frames/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan a render without rendering it.")
+    parser.add_argument("scripts", nargs="+", help="Paths to JSON scripts")
+    parser.add_argument("-q", "--quality", default="l", help="Quality flag: l, m, h, p or k")
+    parser.add_argument("--json", action="store_true", help="Print the plans as JSON")
+    args = parser.parse_args()
+
+    plans = [plan_script(script, args.quality) for script in args.scripts]
+    if args.json:
+        print(json.dumps(plans, indent=2))
+    else:
+        for plan in plans:
+            print_plan(plan)
+            print()
@@ -0,0 +1,228 @@
+"""
+Render jobs behind the MCP server's tools.
+
+Every submitted script becomes a job with its own workspace,
+media/mcp_jobs/<job id>/, holding the script as <name>-<job id>.json, so
+concurrent submissions never share a file (the old tool overwrote test.json).
+Jobs are rendered by wrapper.render_job (own media directory, log and
+metrics file) in a bounded pool of MCP_RENDER_JOBS threads (default 2) at
+the scheduler's INTERACTIVE priority, so they start ahead of batch renders.
+
+Requests are coalesced by render key (job_store.render_key: the canonical
+script JSON plus quality, voice and main.py). A request identical to one
+that is queued or rendering attaches to that job, and one identical to a
+finished job, or to any video in the job store's outputs, gets that video
+right away. Cancelling a job cancels it for every request attached to it.
+
+A job is queued, running, done, failed or cancelled. Cancelling a queued
+job drops it; cancelling a running one terminates its manim process.
+
+The state of every job lives in memory. Progress (percent, frames per
+second, ETA against the job's render plan) comes from progress.py, which
+only reads what the render appended to its log and metrics file since the
+previous call, so polling stays cheap.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from job_store import DONE, FAILED, QUEUED, RUNNING, data_hash, get_job_store, render_key
+from progress import RenderProgress, plan_totals
+from scheduler import INTERACTIVE
+from wrapper import job_paths, render_job
+
+CANCELLED = "cancelled"
+JOBS_DIR = os.path.join("media", "mcp_jobs")
+MAX_RENDERS_ENV = "MCP_RENDER_JOBS"
+DEFAULT_MAX_RENDERS = 2
+
+
+def slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-")[:40] or "video"
+
+
+class RenderService:
+    def __init__(self, workers: int | None = None, render=render_job):
+        self.workers = workers or int(os.environ.get(MAX_RENDERS_ENV, DEFAULT_MAX_RENDERS))
+        self.render = render
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+        self.lock = threading.Lock()
+        self.jobs = {}
+        # Render key -> the latest job for it, to coalesce identical requests
+        self.by_key = {}
+
+    def submit(self, tutorial_data: dict, quality: str = "h", name: str | None = None) -> dict:
+        """
+        Queues a render of tutorial_data and returns its status. A request
+        with the same render key as a queued, running or finished job (see
+        job_store.render_key; the name does not count) returns that job,
+        marked coalesced, instead of rendering again; if the job is done,
+        the reply includes its video like result().
+        """
+        quality = quality[-1]
+        content_hash = data_hash(tutorial_data)
+        key = render_key(content_hash, quality)
+        with self.lock:
+            job = self._find(key)
+            if job is None:
+                job = self._create(tutorial_data, quality, name, key)
+                coalesced = False
+            else:
+                job["requests"] += 1
+                coalesced = True
+        if not coalesced:
+            self.pool.submit(self._run, job)
+        return {**self.result(job["id"]), "coalesced": coalesced}
+
+    def _find(self, key: str) -> dict | None:
+        """The job a request with this render key can attach to."""
+        job = self.jobs.get(self.by_key.get(key))
+        if job is not None:
+            if job["state"] in (QUEUED, RUNNING):
+                return job
+            if job["state"] == DONE and os.path.exists(job["paths"]["video"]):
+                return job
+        # Rendered earlier by this server, a batch run or the daemon
+        output = get_job_store().find_output(key)
+        if output is None:
+            return None
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "key": key,
+            "state": DONE,
+            "quality": None,
+            "script": None,
+            "paths": {"video": output, "log": None},
+            "progress": None,
+            "requests": 0,
+            "submitted": now,
+            "started": now,
+            "finished": now,
+            "error": None,
+            "cancel": threading.Event(),
+        }
+        self.jobs[job["id"]] = job
+        self.by_key[key] = job["id"]
+        return job
+
+    def _create(self, tutorial_data: dict, quality: str, name: str | None, key: str) -> dict:
+        from section_cache import script_parts
+
+        job_id = uuid.uuid4().hex[:12]
+        workspace = os.path.join(JOBS_DIR, job_id)
+        os.makedirs(workspace, exist_ok=True)
+        script = os.path.join(workspace, f"{slug(name or tutorial_data.get('intro', ''))}-{job_id}.json")
+        with open(script, "w", encoding="utf-8") as f:
+            json.dump(tutorial_data, f, indent=4)
+
+        paths = job_paths(script, quality)
+        job = {
+            "id": job_id,
+            "key": key,
+            "state": QUEUED,
+            "quality": quality,
+            "script": script,
+            "paths": paths,
+            # Until the job is planned, progress counts parts
+            "progress": RenderProgress(paths["log"], paths["metrics"], {"parts": len(script_parts(tutorial_data))}),
+            "requests": 1,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "error": None,
+            "cancel": threading.Event(),
+        }
+        self.jobs[job_id] = job
+        self.by_key[key] = job_id
+        return job
+
+    def _run(self, job: dict) -> None:
+        with self.lock:
+            if job["state"] == CANCELLED:
+                return
+            job.update(state=RUNNING, started=time.time())
+        plan = plan_totals(job["script"], job["quality"])
+        if plan:
+            job["progress"].plan = plan
+        try:
+            succeeded, _, _ = self.render(job["script"], job["quality"], INTERACTIVE, job["cancel"], job["paths"])
+            error = None if succeeded else "manim exited with an error, see the log"
+        except Exception as e:
+            succeeded, error = False, str(e)
+        with self.lock:
+            if job["cancel"].is_set():
+                state, error = CANCELLED, None
+            else:
+                state = DONE if succeeded else FAILED
+            job.update(state=state, finished=time.time(), error=error)
+        if state == DONE:
+            # Identical requests after a restart, and batch renders, reuse the video
+            get_job_store().add_output(job["key"], job["paths"]["video"], job["script"])
+
+    def _get(self, job_id: str) -> dict:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job {job_id}")
+        return job
+
+    def status(self, job_id: str) -> dict:
+        with self.lock:
+            job = self._get(job_id)
+            started = job["started"]
+            end = job["finished"] or time.time()
+            return {
+                "job_id": job["id"],
+                "state": job["state"],
+                "quality": job["quality"],
+                "script": job["script"],
+                "requests": job["requests"],
+                "waited_seconds": round((started or end) - job["submitted"], 1),
+                "render_seconds": round(end - started, 1) if started else None,
+                "error": job["error"],
+            }
+
+    def all_jobs(self) -> list:
+        with self.lock:
+            job_ids = list(self.jobs)
+        return [self.status(job_id) for job_id in job_ids]
+
+    def progress(self, job_id: str) -> dict:
+        """Status plus percent complete, frames, animations and parts done, frames per second and ETA."""
+        status = self.status(job_id)
+        tracker = self.jobs[job_id]["progress"]
+        if tracker:
+            status.update(tracker.update())
+        if status["state"] == DONE:
+            status.update(percent=100.0, eta_seconds=0)
+        return status
+
+    def cancel(self, job_id: str) -> dict:
+        with self.lock:
+            job = self._get(job_id)
+            if job["state"] in (QUEUED, RUNNING):
+                job["cancel"].set()
+                if job["state"] == QUEUED:
+                    job.update(state=CANCELLED, finished=time.time())
+        return self.status(job_id)
+
+    def result(self, job_id: str) -> dict:
+        """The video and log of a finished job; for other states, just the status."""
+        status = self.status(job_id)
+        paths = self.jobs[job_id]["paths"]
+        if status["state"] in (DONE, FAILED) and paths["log"]:
+            status["log"] = paths["log"]
+        if status["state"] == DONE:
+            status["video"] = os.path.abspath(paths["video"])
+        return status
+
+    def shutdown(self) -> None:
+        with self.lock:
+            for job in self.jobs.values():
+                job["cancel"].set()
+        self.pool.shutdown(wait=True, cancel_futures=True)
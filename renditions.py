@@ -0,0 +1,186 @@
+"""
+Render a script once and derive every lower quality from it.
+
+A job declares its rendition ladder, either with -r on the command line or
+with a "renditions" list in the script JSON (e.g. ["h", "l"] for the upload
+and a quick review copy). The highest rendition is rendered with main.Video
+(or the section cache with --cached), so TTS, layout and rasterization run
+once. The other renditions are made in a single pass over that movie: every
+frame is decoded once, scaled to each lower size, dropped to that
+rendition's frame rate and encoded, while the audio is copied unchanged.
+
+Held frames (MANIM_STATIC_HOLDS) keep their timestamps, so holds stay two
+frames in every rendition.
+
+Outputs land where manim would have put them,
+media/videos/main/<height>p<fps>/<name>.mp4.
+
+Usage:
+    uv run renditions.py scripts/SeleniumBasics1.json -r h l
+    uv run renditions.py scripts/SeleniumBasics1.json --cached
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+from fractions import Fraction
+
+import av
+
+from scheduler import BATCH, ENCODER_THREADS_ENV, NORMAL, acquire
+from section_cache import VIDEO_DIR, quality_settings, render_script_cached
+
+DEFAULT_LADDER = ["l"]
+# libx264 settings of the derived renditions
+ENCODER_OPTIONS = {"crf": "23", "preset": "medium"}
+
+
+def parse_ladder(qualities: list[str]) -> list[str]:
+    """Quality flags ("qh", "l", ...) without duplicates, highest resolution first."""
+    flags = list(dict.fromkeys(quality[-1] for quality in qualities))
+    return sorted(
+        flags,
+        key=lambda flag: (quality_settings(flag)["pixel_height"], quality_settings(flag)["frame_rate"]),
+        reverse=True,
+    )
+
+
+def rendition_path(name: str, quality: str) -> str:
+    settings = quality_settings(quality)
+    return os.path.join(VIDEO_DIR, f"{settings['pixel_height']}p{settings['frame_rate']}", f"{name}.mp4")
+
+
+def render_top(script_path: str, quality: str, name: str, cached: bool = False) -> str:
+    """
+    Renders the highest rendition of a script and returns its path. The
+    render (each part's, when cached) holds a scheduler.py lease.
+    """
+    if cached:
+        return render_script_cached(script_path, quality, name)
+    command = [sys.executable, "-m", "manim", f"-q{quality}", "main.py", "Video", "-o", f"{name}.mp4"]
+    with acquire("manim", BATCH, script_path) as lease:
+        env = {**os.environ, "MANIM_SCRIPT_FILE": script_path, ENCODER_THREADS_ENV: str(lease.threads)}
+        subprocess.run(command, env=env, check=True)
+    return rendition_path(name, quality)
+
+
+def transcode_renditions(source_path: str, targets: dict) -> dict:
+    """
+    Makes every rendition in targets ({quality flag: output path}) from one
+    decode of source_path, under a scheduler.py lease whose threads the
+    encoders share.
+    """
+    with acquire("transcode", NORMAL, source_path) as lease:
+        return _transcode(source_path, targets, max(lease.threads // len(targets), 1))
+
+
+def _transcode(source_path: str, targets: dict, threads: int) -> dict:
+    outputs = []
+    with av.open(source_path) as source:
+        video_in = source.streams.video[0]
+        audio_in = source.streams.audio[0] if source.streams.audio else None
+        for quality, path in targets.items():
+            settings = quality_settings(quality)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            temp_path = f"{os.path.splitext(path)[0]}.{os.getpid()}.tmp.mp4"
+            container = av.open(temp_path, mode="w")
+            video_out = container.add_stream("libx264", rate=settings["frame_rate"], options=ENCODER_OPTIONS)
+            video_out.width = settings["pixel_width"]
+            video_out.height = settings["pixel_height"]
+            video_out.pix_fmt = "yuv420p"
+            video_out.thread_count = threads
+            audio_out = container.add_stream(template=audio_in) if audio_in else None
+            outputs.append(
+                {
+                    "path": path,
+                    "temp_path": temp_path,
+                    "container": container,
+                    "video": video_out,
+                    "audio": audio_out,
+                    "frame_rate": settings["frame_rate"],
+                    "last_pts": -1,
+                }
+            )
+
+        try:
+            streams = [video_in] + ([audio_in] if audio_in else [])
+            for packet in source.demux(streams):
+                if packet.stream is audio_in:
+                    # Flush packets carry no data, there is nothing to copy
+                    if packet.dts is None:
+                        continue
+                    for output in outputs:
+                        packet.stream = output["audio"]
+                        output["container"].mux(packet)
+                    continue
+                # The final, empty video packet drains the decoder's last frames
+                for frame in packet.decode():
+                    for output in outputs:
+                        # Timestamp in the rendition's frame rate: each output frame
+                        # shows the source frame on screen at its time, the others
+                        # are dropped
+                        pts = math.floor(frame.pts * frame.time_base * output["frame_rate"])
+                        if pts <= output["last_pts"]:
+                            continue
+                        scaled = frame.reformat(
+                            width=output["video"].width,
+                            height=output["video"].height,
+                            format="yuv420p",
+                            interpolation="AREA",
+                        )
+                        scaled.pts = pts
+                        scaled.time_base = Fraction(1, output["frame_rate"])
+                        output["last_pts"] = pts
+                        for out_packet in output["video"].encode(scaled):
+                            output["container"].mux(out_packet)
+            for output in outputs:
+                for out_packet in output["video"].encode(None):
+                    output["container"].mux(out_packet)
+        finally:
+            for output in outputs:
+                output["container"].close()
+
+    for output in outputs:
+        os.replace(output["temp_path"], output["path"])
+    return {quality: path for quality, path in targets.items()}
+
+
+def render_renditions(
+    script_path: str, ladder: list[str] | None = None, output_name: str | None = None, cached: bool = False
+) -> dict:
+    """
+    Renders a script at the top of its rendition ladder and transcodes the rest.
+
+    Returns {quality flag: video path}.
+    """
+    if ladder is None:
+        with open(script_path, "r") as f:
+            ladder = json.load(f).get("renditions") or DEFAULT_LADDER
+    ladder = parse_ladder(ladder)
+    name = output_name or os.path.splitext(os.path.basename(script_path))[0]
+
+    top = ladder[0]
+    print(f"Rendering {script_path} at -q{top}")
+    videos = {top: render_top(script_path, top, name, cached)}
+    targets = {quality: rendition_path(name, quality) for quality in ladder[1:]}
+    if targets:
+        print(f"Transcoding {', '.join(f'-q{quality}' for quality in targets)} from {videos[top]}")
+        videos.update(transcode_renditions(videos[top], targets))
+    for quality, path in videos.items():
+        print(f"  -q{quality}: {path}")
+    return videos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render once, transcode every lower quality.")
+    parser.add_argument("script", help="Path to the JSON script")
+    parser.add_argument(
+        "-r", "--renditions", nargs="+", default=None, help="Quality flags, e.g. h l (default: the script's \"renditions\")"
+    )
+    parser.add_argument("-o", "--output", default=None, help="Output file name (without extension)")
+    parser.add_argument("--cached", action="store_true", help="Render the top rendition with the section cache")
+    args = parser.parse_args()
+    render_renditions(args.script, args.renditions, args.output, args.cached)
@@ -1,55 +1,115 @@
-from mcp.server.fastmcp import FastMCP
+import asyncio
+
+from mcp.server.fastmcp import Context, FastMCP
+
+from job_store import QUEUED, RUNNING
+from progress import describe
+from render_service import RenderService
 
 mcp = FastMCP("Video Generation")
+# Renders run in the background, a few at a time, each in its own workspace
+service = RenderService()
+# Seconds between progress notifications of wait_for_job
+PROGRESS_INTERVAL = 2
+
 
 @mcp.tool("generate_video")
-def generate_video(json_data: dict) -> str:
+def generate_video(json_data: dict, quality: str = "h", name: str | None = None) -> dict:
     """
-    Generate a video from the given JSON object.
-    
+    Queue a video render of the given JSON object and return right away.
+
     Args:
         json_data (dict): Tutorial data as a JSON object.
-        
+        quality (str): Manim quality flag: l, m or h.
+        name (str): Optional name for the video file.
+
+    Returns:
+        dict: The job's id and state. Poll it with job_status or job_progress,
+        then fetch the video with job_result. Sending the same script and
+        quality again returns the same job (coalesced: true) instead of
+        rendering it twice; if that job is done, "video" is its path.
+    """
+    return service.submit(json_data, quality, name)
+
+
+@mcp.tool("job_status")
+def job_status(job_id: str) -> dict:
+    """
+    Get the state of a render job: queued, running, done, failed or cancelled.
+
+    Args:
+        job_id (str): Id returned by generate_video.
+    """
+    return service.status(job_id)
+
+
+@mcp.tool("job_progress")
+def job_progress(job_id: str) -> dict:
+    """
+    Get the state of a render job with its percent complete, frames per
+    second and estimated seconds left.
+
+    Args:
+        job_id (str): Id returned by generate_video.
+    """
+    return service.progress(job_id)
+
+
+@mcp.tool("wait_for_job")
+async def wait_for_job(job_id: str, ctx: Context, timeout: float = 600) -> dict:
+    """
+    Wait for a render job to finish, sending progress notifications while it renders.
+
+    Args:
+        job_id (str): Id returned by generate_video.
+        timeout (float): Seconds to wait at most before returning the current progress.
+
     Returns:
-        str: Path to the generated video file, PID of the Manim rendering process, and path to the log file.
-    """
-    import subprocess
-    import json
-    import datetime
-    
-    timestamp = datetime.datetime.now().strftime("%d-%m-%Y-%H-%M-%S")
-    filename = f"GeneratedVideo_{timestamp}.mp4"
-    log_filename = f"manim_log_{timestamp}.txt"
-
-    # Write the JSON object to test.json in the same directory
-    with open("test.json", "w") as f:
-        json.dump(json_data, f)
-
-    print(f"Generating video from JSON object...")
-
-    command = [
-        "manim",
-        "-pqh",
-        "main.py",
-        "Video",
-        "-o",
-        filename,
-    ]
-
-    # Run the command in the background using Popen
-    print(f"Starting Manim rendering...")
-    print(f"Output file will be: {filename}")
-    print(f"Log file will be: {log_filename}")
-
-    # Open the log file and start the subprocess (don't use 'with' for background processes)
-    log_file = open(log_filename, "wb")  # Binary mode like the working version
-    process = subprocess.Popen(command, stdout=log_file, stderr=log_file)
-    
-    print(f"Manim process started in the background with PID: {process.pid}")
-    print(f"Check {log_filename} for rendering progress.")
-
-    return f"Video: {filename}, PID: {process.pid}, Log: {log_filename}"
+        dict: The job's result once it finished, otherwise its progress.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        progress = service.progress(job_id)
+        if progress["state"] not in (QUEUED, RUNNING):
+            return service.result(job_id)
+        message = describe(progress) if progress["state"] == RUNNING else "queued"
+        await ctx.report_progress(progress["percent"] or 0, 100, message)
+        if loop.time() >= deadline:
+            return progress
+        await asyncio.sleep(PROGRESS_INTERVAL)
+
+
+@mcp.tool("list_jobs")
+def list_jobs() -> list:
+    """List every render job submitted to this server with its state."""
+    return service.all_jobs()
+
+
+@mcp.tool("cancel_job")
+def cancel_job(job_id: str) -> dict:
+    """
+    Cancel a queued or running render job.
+
+    Args:
+        job_id (str): Id returned by generate_video.
+    """
+    return service.cancel(job_id)
+
+
+@mcp.tool("job_result")
+def job_result(job_id: str) -> dict:
+    """
+    Get the video path of a finished render job, or its log if it failed.
+
+    Args:
+        job_id (str): Id returned by generate_video.
+    """
+    return service.result(job_id)
 
 
 if __name__ == "__main__":
-    mcp.run()
+    try:
+        mcp.run()
+    finally:
+        service.shutdown()
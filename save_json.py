@@ -1,42 +1,92 @@
-
 import os
 import json
 import datetime
 from mcp.server.fastmcp import FastMCP
+from script_schema import check_script
 
 # Create the 'scripts' directory if it doesn't exist
 os.makedirs("scripts", exist_ok=True)
 
 mcp = FastMCP("Save JSON Tool")
 
+
+def write_script(script: dict) -> str:
+    """
+    Writes a script to a new timestamped file in 'scripts' and returns its path.
+
+    The file appears complete or not at all (the render daemon may pick it up
+    right away), and scripts saved in the same second get -1, -2... suffixes.
+    """
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    temp_path = os.path.join("scripts", f".{timestamp}-{os.getpid()}-{id(script)}.tmp")
+    with open(temp_path, "w") as f:
+        json.dump(script, f, indent=4)
+    try:
+        suffix = 0
+        while True:
+            filepath = os.path.join("scripts", f"{timestamp}{f'-{suffix}' if suffix else ''}.json")
+            try:
+                # Fails instead of overwriting if the name is taken
+                os.link(temp_path, filepath)
+                return filepath
+            except FileExistsError:
+                suffix += 1
+    finally:
+        os.remove(temp_path)
+
+
+def save_script(json_data: dict) -> dict:
+    """Validates, normalizes and saves one script. Returns the outcome as a dict."""
+    result = check_script(json_data)
+    if not result["valid"]:
+        print(f"Rejected script with {len(result['errors'])} errors")
+        return {"saved": False, "path": None, "errors": result["errors"]}
+    try:
+        filepath = write_script(result["script"])
+    except Exception as e:
+        error_message = f"Error saving JSON data: {e}"
+        print(error_message)
+        return {"saved": False, "path": None, "errors": [{"path": "/", "code": "io", "message": error_message}]}
+    print(f"Successfully saved JSON data to {filepath}")
+    return {"saved": True, "path": filepath, "errors": []}
+
+
 @mcp.tool("save_json")
-def save_json(json_data: dict) -> str:
+def save_json(json_data: dict) -> dict:
     """
-    Saves a JSON object to a new file in the 'scripts' directory.
+    Validates a tutorial script and saves it to a new file in the 'scripts' directory.
 
-    The filename will be based on the current timestamp to ensure uniqueness.
+    The script is normalized first (whitespace, default section type, code
+    indentation). A script with errors, such as a quiz without an answer, an
+    unknown section type or a code_string too long for the screen, is not saved.
 
     Args:
         json_data (dict): The JSON object to be saved.
 
     Returns:
-        str: A message indicating the path to the newly created file.
+        dict: "saved", the "path" of the new file, and "errors", each with the
+        "path" of the offending field, a "code" and a "message".
     """
-    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-    filename = f"{timestamp}.json"
-    filepath = os.path.join("scripts", filename)
+    return save_script(json_data)
+
+
+@mcp.tool("save_many")
+def save_many(scripts: list[dict]) -> dict:
+    """
+    Validates and saves several tutorial scripts at once. Every valid script
+    is saved even if others in the batch are rejected.
+
+    Args:
+        scripts (list[dict]): The JSON objects to be saved.
+
+    Returns:
+        dict: "saved" and "rejected" counts and "results", one per script in
+        the same order, like save_json's.
+    """
+    results = [save_script(json_data) for json_data in scripts]
+    saved = sum(result["saved"] for result in results)
+    return {"saved": saved, "rejected": len(results) - saved, "results": results}
 
-    try:
-        with open(filepath, 'w') as f:
-            json.dump(json_data, f, indent=4)
-        
-        message = f"Successfully saved JSON data to {filepath}"
-        print(message)
-        return message
-    except Exception as e:
-        error_message = f"Error saving JSON data: {e}"
-        print(error_message)
-        return error_message
 
 if __name__ == "__main__":
     mcp.run()
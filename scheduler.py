@@ -0,0 +1,269 @@
+"""
+Machine-wide CPU and memory budget for renders and encodes.
+
+Manim renders, shorts.py and podcast.py run as separate processes and every
+libx264 encode uses all cores by default, so running a few at once
+oversubscribes the machine. Each of them now asks for a lease first:
+
+    with acquire("manim", priority=BATCH, label=script) as lease:
+        ...  # encode with lease.threads threads
+
+A lease reserves the CPUs and memory of its job type (JOB_PROFILES) out of
+the budget (RENDER_CPU_BUDGET / RENDER_MEMORY_BUDGET_MB, defaulting to all
+CPUs and 80% of RAM). Waiting requests are granted strictly by priority,
+then age, so an interactive GUI preview or MCP request (INTERACTIVE) starts
+before any waiting batch work. The encoder gets lease.threads threads
+instead of every core.
+
+Leases live in media/scheduler.sqlite, shared by every process on the
+machine; leases of processes that died are dropped automatically.
+
+Usage:
+    uv run scheduler.py            # queue depth and utilization
+    uv run scheduler.py --watch
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+SCHEDULER_PATH = os.path.join("media", "scheduler.sqlite")
+# Environment variable the manim file writer reads its encoder thread count from
+ENCODER_THREADS_ENV = "MANIM_ENCODER_THREADS"
+POLL_SECONDS = 0.5
+
+INTERACTIVE = 0
+NORMAL = 5
+BATCH = 10
+
+# What one job of each type needs. Manim rasterizes on one core and encodes on the rest
+JOB_PROFILES = {
+    "manim": {"cpus": 2, "memory_mb": 1500},
+    "transcode": {"cpus": 4, "memory_mb": 800},
+    "short": {"cpus": 2, "memory_mb": 1000},
+    "podcast": {"cpus": 2, "memory_mb": 1000},
+}
+
+
+def total_memory_mb() -> int | None:
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def cpu_budget() -> int:
+    return int(os.environ.get("RENDER_CPU_BUDGET", os.cpu_count() or 1))
+
+
+def memory_budget_mb() -> int:
+    if "RENDER_MEMORY_BUDGET_MB" in os.environ:
+        return int(os.environ["RENDER_MEMORY_BUDGET_MB"])
+    total = total_memory_mb()
+    # Unknown memory: only the CPU budget limits
+    return int(total * 0.8) if total else 1 << 30
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass
+    return True
+
+
+@dataclass
+class Lease:
+    id: int
+    kind: str
+    cpus: int
+    memory_mb: int
+    waited: float
+
+    @property
+    def threads(self) -> int:
+        """Encoder threads this job may use."""
+        return max(self.cpus, 1)
+
+
+class Scheduler:
+    def __init__(self, path: str = SCHEDULER_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS leases (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    label TEXT,
+                    priority INTEGER NOT NULL,
+                    cpus INTEGER NOT NULL,
+                    memory_mb INTEGER NOT NULL,
+                    pid INTEGER NOT NULL,
+                    granted INTEGER NOT NULL DEFAULT 0,
+                    created REAL NOT NULL,
+                    started REAL
+                )
+                """
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS leases_waiting ON leases (granted, priority, id)")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _drop_dead(self, db) -> None:
+        for lease_id, pid in db.execute("SELECT id, pid FROM leases").fetchall():
+            if not process_alive(pid):
+                db.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    def request(self, kind: str, priority: int = NORMAL, label: str | None = None) -> int:
+        profile = JOB_PROFILES[kind]
+        # A job bigger than the whole budget would never start, clamp it
+        cpus = min(profile["cpus"], cpu_budget())
+        memory_mb = min(profile["memory_mb"], memory_budget_mb())
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO leases (kind, label, priority, cpus, memory_mb, pid, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, label, priority, cpus, memory_mb, os.getpid(), time.time()),
+            )
+        return cursor.lastrowid
+
+    def try_grant(self, lease_id: int) -> bool:
+        """Grants a waiting request if it is next in line and fits the budget."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                self._drop_dead(db)
+                used_cpus, used_memory = db.execute(
+                    "SELECT COALESCE(SUM(cpus), 0), COALESCE(SUM(memory_mb), 0) FROM leases WHERE granted = 1"
+                ).fetchone()
+                head = db.execute(
+                    "SELECT id, cpus, memory_mb FROM leases WHERE granted = 0 ORDER BY priority, id LIMIT 1"
+                ).fetchone()
+                granted = (
+                    head is not None
+                    and head[0] == lease_id
+                    and used_cpus + head[1] <= cpu_budget()
+                    and used_memory + head[2] <= memory_budget_mb()
+                )
+                if granted:
+                    db.execute("UPDATE leases SET granted = 1, started = ? WHERE id = ?", (time.time(), lease_id))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return granted
+
+    def release(self, lease_id: int) -> None:
+        with self._connect() as db:
+            db.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    def status(self) -> dict:
+        """Queue depth and utilization of the budget."""
+        with self._connect() as db:
+            self._drop_dead(db)
+            rows = db.execute(
+                "SELECT kind, label, priority, cpus, memory_mb, granted, created, started FROM leases ORDER BY priority, id"
+            ).fetchall()
+        running = [row for row in rows if row[5]]
+        waiting = [row for row in rows if not row[5]]
+        cpus, memory = cpu_budget(), memory_budget_mb()
+        used_cpus = sum(row[3] for row in running)
+        used_memory = sum(row[4] for row in running)
+        return {
+            "cpu_budget": cpus,
+            "memory_budget_mb": memory,
+            "cpus_in_use": used_cpus,
+            "memory_in_use_mb": used_memory,
+            "cpu_utilization": used_cpus / cpus,
+            "memory_utilization": used_memory / memory,
+            "queue_depth": len(waiting),
+            "running": [
+                {"kind": row[0], "label": row[1], "priority": row[2], "cpus": row[3], "seconds": time.time() - row[7]}
+                for row in running
+            ],
+            "waiting": [
+                {"kind": row[0], "label": row[1], "priority": row[2], "seconds": time.time() - row[6]}
+                for row in waiting
+            ],
+        }
+
+
+@contextmanager
+def encoder_threads(threads: int):
+    """Limits the encoders of manim scenes rendered in this process to threads while the block runs."""
+    previous = os.environ.get(ENCODER_THREADS_ENV)
+    os.environ[ENCODER_THREADS_ENV] = str(threads)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop(ENCODER_THREADS_ENV, None)
+        else:
+            os.environ[ENCODER_THREADS_ENV] = previous
+
+
+@contextmanager
+def acquire(kind: str, priority: int = NORMAL, label: str | None = None, scheduler: Scheduler | None = None):
+    """Waits until a job of this kind fits the machine's budget and holds its lease while the block runs."""
+    scheduler = scheduler or Scheduler()
+    requested = time.monotonic()
+    lease_id = scheduler.request(kind, priority, label)
+    try:
+        announced = False
+        while not scheduler.try_grant(lease_id):
+            if not announced:
+                print(f"Waiting for CPU/memory budget to start {kind} {label or ''}".rstrip())
+                announced = True
+            time.sleep(POLL_SECONDS)
+        profile = JOB_PROFILES[kind]
+        yield Lease(
+            lease_id,
+            kind,
+            min(profile["cpus"], cpu_budget()),
+            min(profile["memory_mb"], memory_budget_mb()),
+            time.monotonic() - requested,
+        )
+    finally:
+        scheduler.release(lease_id)
+
+
+def print_status(status: dict) -> None:
+    print(
+        f"CPU {status['cpus_in_use']}/{status['cpu_budget']} ({100 * status['cpu_utilization']:.0f}%), "
+        f"memory {status['memory_in_use_mb']}/{status['memory_budget_mb']} MB "
+        f"({100 * status['memory_utilization']:.0f}%), {status['queue_depth']} waiting"
+    )
+    for lease in status["running"]:
+        print(f"  running  p{lease['priority']:<3} {lease['kind']:<10} {lease['cpus']} CPUs  {lease['seconds']:6.0f}s  {lease['label'] or ''}")
+    for lease in status["waiting"]:
+        print(f"  waiting  p{lease['priority']:<3} {lease['kind']:<10}         {lease['seconds']:6.0f}s  {lease['label'] or ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the render scheduler's queue and utilization.")
+    parser.add_argument("--watch", action="store_true", help="Refresh every two seconds")
+    args = parser.parse_args()
+    scheduler = Scheduler()
+    while True:
+        print_status(scheduler.status())
+        if not args.watch:
+            break
+        time.sleep(2)
+        print()
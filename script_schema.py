@@ -0,0 +1,205 @@
+"""
+Schema, validator and normalizer for tutorial scripts.
+
+main.py accepts almost anything and fails late: a quiz without an answer
+is silently skipped, an unknown section type is drawn as a code section,
+and a long code_string or intro runs off the frame minutes into a render.
+check_script() catches all of that when a script is saved:
+
+    result = check_script(data)
+    result["valid"]    # False if any error was found
+    result["errors"]   # [{"path": "sections/3/answer", "code": "required", "message": ...}]
+    result["script"]   # the normalized script
+
+Normalizing strips stray whitespace, fills in the default section type,
+dedents code and replaces its tabs, and sorts highlight_lines. The schema
+is compiled once (jsonschema Draft 2020-12 plus a maxLines keyword for
+code), so a check takes under a millisecond.
+
+Check files from the command line:
+    uv run script_schema.py scripts/*.json
+"""
+
+import argparse
+import json
+import textwrap
+
+from jsonschema import Draft202012Validator, ValidationError
+from jsonschema.validators import extend
+
+SECTION_TYPES = ("code", "quiz", "real_world")
+# Lines of code that fit on screen at the Code mobject's size (font size 24)
+MAX_CODE_LINES = 20
+# Intro and quiz texts are not scaled down, longer ones leave the frame
+MAX_TITLE_CHARS = 110
+MAX_QUIZ_CHARS = 150
+MAX_ANNOTATION_CHARS = 120
+
+TEXT = {"type": "string"}
+CODE = {"type": "string", "minLength": 1, "maxLines": MAX_CODE_LINES}
+
+SCRIPT_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "intro": {**TEXT, "maxLength": MAX_TITLE_CHARS},
+        "outro": TEXT,
+        "sections": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "properties": {"type": {"enum": list(SECTION_TYPES)}},
+                "required": ["type"],
+                "allOf": [
+                    {
+                        "if": {"properties": {"type": {"const": "code"}}},
+                        "then": {
+                            "properties": {
+                                "type": True,
+                                "code_string": CODE,
+                                "annotation": {**TEXT, "maxLength": MAX_ANNOTATION_CHARS},
+                                "explanation": TEXT,
+                                "highlight_lines": {"type": "array", "items": {"type": "integer", "minimum": 1}},
+                            },
+                            "required": ["code_string"],
+                            "additionalProperties": False,
+                        },
+                    },
+                    {
+                        "if": {"properties": {"type": {"const": "quiz"}}},
+                        "then": {
+                            "properties": {
+                                "type": True,
+                                "question": {**TEXT, "minLength": 1, "maxLength": MAX_QUIZ_CHARS},
+                                "answer": {**TEXT, "minLength": 1, "maxLength": MAX_QUIZ_CHARS},
+                            },
+                            "required": ["question", "answer"],
+                            "additionalProperties": False,
+                        },
+                    },
+                    {
+                        "if": {"properties": {"type": {"const": "real_world"}}},
+                        "then": {
+                            "properties": {"type": True, "description": TEXT, "code_string": CODE},
+                            "anyOf": [{"required": ["description"]}, {"required": ["code_string"]}],
+                            "additionalProperties": False,
+                        },
+                    },
+                ],
+            },
+        },
+        "renditions": {"type": "array", "items": {"enum": ["l", "m", "h", "p", "k"]}, "uniqueItems": True},
+    },
+    "required": ["sections"],
+    "additionalProperties": False,
+}
+
+
+def _max_lines(validator, limit, instance, schema):
+    if validator.is_type(instance, "string"):
+        lines = len(instance.splitlines())
+        if lines > limit:
+            yield ValidationError(f"has {lines} lines, at most {limit} fit on screen")
+
+
+ScriptValidator = extend(Draft202012Validator, {"maxLines": _max_lines})
+Draft202012Validator.check_schema(SCRIPT_SCHEMA)
+VALIDATOR = ScriptValidator(SCRIPT_SCHEMA)
+
+
+def normalize_code(code: str) -> str:
+    lines = [line.rstrip() for line in code.expandtabs(4).splitlines()]
+    return textwrap.dedent("\n".join(lines)).strip("\n")
+
+
+def normalize_script(data):
+    """A cleaned-up copy of a script; anything that is not the expected shape is left for the validator."""
+    if not isinstance(data, dict):
+        return data
+    script = {key: value.strip() if isinstance(value, str) else value for key, value in data.items()}
+    if isinstance(script.get("sections"), list):
+        script["sections"] = [normalize_section(section) for section in script["sections"]]
+    return script
+
+
+def normalize_section(section):
+    if not isinstance(section, dict):
+        return section
+    normalized = {}
+    for key, value in section.items():
+        if key == "code_string" and isinstance(value, str):
+            value = normalize_code(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized[key] = value
+    # main.py draws a section without a type as code
+    normalized.setdefault("type", "code")
+    if isinstance(normalized["type"], str):
+        normalized["type"] = normalized["type"].strip().lower()
+    lines = normalized.get("highlight_lines")
+    if isinstance(lines, list) and all(isinstance(line, int) for line in lines):
+        normalized["highlight_lines"] = sorted(set(lines))
+    return normalized
+
+
+def error_path(error: ValidationError) -> str:
+    return "/".join(str(part) for part in error.absolute_path) or "/"
+
+
+def semantic_errors(script: dict) -> list:
+    """Errors the schema cannot express."""
+    errors = []
+    sections = script.get("sections")
+    if not isinstance(sections, list):
+        # The schema reports it
+        return errors
+    for index, section in enumerate(sections):
+        if not isinstance(section, dict) or section.get("type") != "code":
+            continue
+        code, lines = section.get("code_string"), section.get("highlight_lines")
+        if isinstance(code, str) and isinstance(lines, list) and all(isinstance(line, int) for line in lines):
+            count = len(code.splitlines())
+            beyond = [line for line in lines if line > count]
+            if beyond:
+                errors.append(
+                    {
+                        "path": f"sections/{index}/highlight_lines",
+                        "code": "highlight_range",
+                        "message": f"lines {beyond} are past the end of the {count}-line code_string",
+                    }
+                )
+    return errors
+
+
+def check_script(data) -> dict:
+    """Normalizes and validates a script. Returns {"valid", "errors", "script"}."""
+    script = normalize_script(data)
+    errors = [
+        {"path": error_path(error), "code": error.validator, "message": error.message}
+        for error in sorted(VALIDATOR.iter_errors(script), key=lambda error: [(isinstance(part, str), part) for part in error.absolute_path])
+    ]
+    if isinstance(script, dict):
+        errors.extend(semantic_errors(script))
+    return {"valid": not errors, "errors": errors, "script": script}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate tutorial scripts.")
+    parser.add_argument("scripts", nargs="+", help="JSON script files")
+    args = parser.parse_args()
+    invalid = 0
+    for path in args.scripts:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = check_script(json.load(f))
+        except json.JSONDecodeError as e:
+            result = {"valid": False, "errors": [{"path": "/", "code": "json", "message": str(e)}]}
+        if result["valid"]:
+            print(f"OK       {path}")
+            continue
+        invalid += 1
+        print(f"INVALID  {path}")
+        for error in result["errors"]:
+            print(f"    {error['path']}: {error['message']}")
+    raise SystemExit(1 if invalid else 0)
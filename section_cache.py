@@ -0,0 +1,271 @@
+"""
+Per-section render cache for main.Video.
+
+A script is split into parts: the intro, every section (rendered together
+with the transition that follows it) and the outro. Each part is rendered
+on its own with main.SectionVideo and stored under a key that hashes
+everything that can change its pixels or sound: the part's JSON, the intro
+title pinned above it, the voice, the quality and the code style / scene
+source. Re-running a script only renders the parts whose key changed and
+stitches the rest from the cache without re-encoding.
+
+Parts are independent scenes (each section fades out and is followed by a
+full-frame transition; the pinned intro title is re-added up front), so
+missing parts can also be rendered in parallel processes with -j.
+
+Every run writes a manifest to media/section_cache/manifests/<script>.json
+listing which parts were cache hits and which were rendered.
+
+Usage:
+    uv run section_cache.py scripts/SeleniumBasics1.json -q l
+    uv run section_cache.py scripts/SeleniumBasics1.json -q h -j 0
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import av
+
+from scheduler import BATCH, acquire, encoder_threads
+
+CACHE_DIR = os.path.join("media", "section_cache")
+PARTS_DIR = os.path.join(CACHE_DIR, "parts")
+MANIFEST_DIR = os.path.join(CACHE_DIR, "manifests")
+VIDEO_DIR = os.path.join("media", "videos", "main")
+MAIN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def quality_settings(quality: str) -> dict:
+    """Returns the manim config values for a quality flag ("l", "m", "h", "ql", ...)."""
+    from manim.constants import QUALITIES
+
+    flag = quality[-1]
+    for settings in QUALITIES.values():
+        if settings["flag"] == flag:
+            return {
+                "pixel_width": settings["pixel_width"],
+                "pixel_height": settings["pixel_height"],
+                "frame_rate": settings["frame_rate"],
+            }
+    raise ValueError(f"Unknown quality: {quality}")
+
+
+def script_parts(tutorial_data: dict) -> list:
+    """Lists the parts main.SectionVideo can render for a script, in playback order."""
+    parts = []
+    if tutorial_data.get("intro"):
+        parts.append("intro")
+    parts.extend(range(len(tutorial_data.get("sections", []))))
+    if tutorial_data.get("outro"):
+        parts.append("outro")
+    return parts
+
+
+def part_name(part) -> str:
+    return part if isinstance(part, str) else f"section-{part:02d}"
+
+
+def style_fingerprint() -> str:
+    """Hash of the code style and the scene source, so style edits invalidate the cache."""
+    import manim
+    from main import CODE_STYLE
+
+    with open(MAIN_FILE, "rb") as f:
+        source = f.read()
+    payload = json.dumps(CODE_STYLE, sort_keys=True, default=str).encode("utf-8")
+    digest = hashlib.sha256(source + payload + manim.__version__.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def part_key(tutorial_data: dict, part, quality: str, voice: str, style: str) -> str:
+    """Content-addressed key of a single part."""
+    if part == "intro":
+        content = tutorial_data.get("intro", "")
+    elif part == "outro":
+        content = tutorial_data.get("outro", "")
+    else:
+        content = tutorial_data["sections"][part]
+    payload = {
+        "part": "section" if isinstance(part, int) else part,
+        "content": content,
+        # Every part after the intro draws the intro title at the top
+        "intro": tutorial_data.get("intro", ""),
+        "voice": voice,
+        "quality": quality_settings(quality),
+        "style": style,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def render_part(tutorial_data: dict, part, quality: str, output_path: str, priority: int = BATCH) -> str:
+    """
+    Renders one part with main.SectionVideo and moves the movie to output_path.
+    The render waits for a scheduler.py lease at priority.
+    """
+    from manim import tempconfig
+    from main import SectionVideo
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # Each part gets its own media dir so partial movie files never collide
+    with (
+        acquire("manim", priority, part_name(part)) as lease,
+        encoder_threads(lease.threads),
+        tempfile.TemporaryDirectory(prefix="section_") as media_dir,
+    ):
+        settings = quality_settings(quality)
+        settings.update({"media_dir": media_dir, "output_file": "part", "disable_caching": True})
+        with tempconfig(settings):
+            scene = SectionVideo(part=part, tutorial_data=tutorial_data)
+            scene.render()
+            movie_path = scene.renderer.file_writer.movie_file_path
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        shutil.move(str(movie_path), temp_path)
+        os.replace(temp_path, output_path)
+    return output_path
+
+
+def concat_movies(movie_paths: list, output_path: str) -> str:
+    """Joins movies with the ffmpeg concat demuxer, copying packets without re-encoding."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    list_path = f"{output_path}.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for movie_path in movie_paths:
+            f.write(f"file 'file:{Path(movie_path).resolve().as_posix()}'\n")
+
+    try:
+        with av.open(list_path, format="concat", options={"safe": "0"}) as source, av.open(
+            output_path, mode="w"
+        ) as output:
+            streams = {}
+            for stream in source.streams:
+                if stream.type in ("video", "audio"):
+                    streams[stream.index] = output.add_stream(template=stream)
+            last_audio_dts = None
+            for packet in source.demux(*[source.streams[i] for i in streams]):
+                # Skip the flushing packets demux generates
+                if packet.dts is None:
+                    continue
+                if packet.stream.type == "video":
+                    # dts of consecutive files is not monotonic, let libav compute it
+                    packet.dts = None
+                else:
+                    # AAC padding makes each file's audio overlap the next one by
+                    # a frame; drop the overlapping (silent priming) packet
+                    if last_audio_dts is not None and packet.dts <= last_audio_dts:
+                        continue
+                    last_audio_dts = packet.dts
+                packet.stream = streams[packet.stream.index]
+                output.mux(packet)
+    finally:
+        os.remove(list_path)
+    return output_path
+
+
+def write_manifest(script_path: str, manifest: dict) -> str:
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    script_name = os.path.splitext(os.path.basename(script_path))[0]
+    manifest_path = os.path.join(MANIFEST_DIR, f"{script_name}.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def render_script_cached(
+    script_path: str, quality: str = "l", output_name: str | None = None, jobs: int = 1
+) -> str:
+    """
+    Renders a script part by part, reusing every part whose key is already cached.
+
+    With jobs > 1 the missing parts are rendered in a pool of that many
+    processes, each running its own SectionVideo scene. Every part render
+    holds a scheduler.py lease, so the pool never exceeds the machine's budget.
+
+    Returns the path of the stitched video.
+    """
+    from generate_voice import get_voice
+
+    with open(script_path, "r") as f:
+        tutorial_data = json.load(f)
+
+    voice = get_voice()
+    style = style_fingerprint()
+    settings = quality_settings(quality)
+    manifest = {
+        "script": script_path,
+        "quality": quality,
+        "voice": voice,
+        "jobs": jobs,
+        "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        "parts": [],
+    }
+
+    movies = []
+    misses = []
+    for part in script_parts(tutorial_data):
+        key = part_key(tutorial_data, part, quality, voice, style)
+        movie_path = os.path.join(PARTS_DIR, f"{key}.mp4")
+        if os.path.exists(movie_path):
+            status = "hit"
+            # Touch the file so stale parts can be pruned by age
+            os.utime(movie_path)
+        else:
+            status = "miss"
+            misses.append((part, key, movie_path))
+        manifest["parts"].append({"part": part_name(part), "key": key, "status": status, "movie": movie_path})
+        movies.append(movie_path)
+
+    if jobs > 1 and len(misses) > 1:
+        # spawn keeps every worker's manim config independent of this process
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(jobs, len(misses)), mp_context=context) as pool:
+            futures = {}
+            for part, key, movie_path in misses:
+                print(f"Queued {part_name(part)} ({key[:12]})")
+                futures[pool.submit(render_part, tutorial_data, part, quality, movie_path)] = part
+            for future in as_completed(futures):
+                future.result()
+                print(f"Rendered {part_name(futures[future])}")
+    else:
+        for part, key, movie_path in misses:
+            print(f"Rendering {part_name(part)} ({key[:12]})")
+            render_part(tutorial_data, part, quality, movie_path)
+
+    if not movies:
+        raise ValueError(f"{script_path} has nothing to render")
+
+    name = output_name or os.path.splitext(os.path.basename(script_path))[0]
+    resolution = f"{settings['pixel_height']}p{settings['frame_rate']}"
+    output_path = os.path.join(VIDEO_DIR, resolution, f"{name}.mp4")
+    concat_movies(movies, output_path)
+
+    statuses = [p["status"] for p in manifest["parts"]]
+    manifest["hits"] = statuses.count("hit")
+    manifest["misses"] = statuses.count("miss")
+    manifest["output"] = output_path
+    manifest["finished"] = datetime.datetime.now().isoformat(timespec="seconds")
+    manifest_path = write_manifest(script_path, manifest)
+
+    print(f"{manifest['hits']} cached, {manifest['misses']} rendered. Manifest: {manifest_path}")
+    print(f"Video: {output_path}")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a script with the per-section cache.")
+    parser.add_argument("script", help="Path to the JSON script")
+    parser.add_argument("-q", "--quality", default="l", help="Quality flag: l, m, h, p or k")
+    parser.add_argument("-o", "--output", default=None, help="Output file name (without extension)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Render missing sections in this many processes (0 = one per CPU)"
+    )
+    args = parser.parse_args()
+    render_script_cached(args.script, args.quality, args.output, args.jobs or os.cpu_count())
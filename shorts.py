@@ -37,6 +37,7 @@ from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.datavalidation import DataValidation
 from PIL import Image
 from io import BytesIO
+from scheduler import NORMAL, acquire
 
 # --- Constants ---
 OUTPUT_FOLDER = "generated_shorts"
@@ -73,10 +74,6 @@ def wrap_text(text, width=40):
     import textwrap
     return "\n".join(textwrap.wrap(text, width=width))
 
-def get_audio_duration(audio_path):
-    """Returns the duration of the audio file in seconds."""
-    return AudioFileClip(audio_path).duration
-
 def create_short(quote, audio_path, output_path, date_str):
     """Creates a short video with the given quote and NASA image."""
     duration = 15  # seconds
@@ -96,16 +93,17 @@ def create_short(quote, audio_path, output_path, date_str):
 
     # --- Audio ---
     if os.path.exists(audio_path):
-        print(f"Audio file {audio_path} does not exist.")
-        
-        audio_total_duration = get_audio_duration(audio_path)
-        if audio_total_duration > duration:
-            max_start = audio_total_duration - duration
+        # Probe the file once and cut the clip from the same reader
+        audio = AudioFileClip(audio_path)
+        if audio.duration > duration:
+            max_start = audio.duration - duration
             start_time = random.uniform(0, max_start)
         else:
             start_time = 0
-        audio = AudioFileClip(audio_path).subclipped(start_time, start_time + duration)
+        audio = audio.subclipped(start_time, min(start_time + duration, audio.duration))
         bg = bg.with_audio(audio)
+    else:
+        print(f"Audio file {audio_path} does not exist.")
 
     # --- Text Overlay ---
     txt_clip = (TextClip(
@@ -120,7 +118,8 @@ def create_short(quote, audio_path, output_path, date_str):
 
     # --- Final Video ---
     video = CompositeVideoClip([bg, txt_clip])
-    video.write_videofile(output_path, fps=30, codec="libx264", audio_codec="aac")
+    with acquire("short", NORMAL, output_path) as lease:
+        video.write_videofile(output_path, fps=30, codec="libx264", audio_codec="aac", threads=lease.threads)
     os.remove(image_path)  # Clean up the downloaded image
 
 def setup_excel_file():
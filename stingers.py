@@ -0,0 +1,122 @@
+"""
+Reusable pre-rendered clips ("stingers") for main.Video.
+
+A stinger is a function that plays some animations on a scene and leaves the
+scene as it found it, like the fade-to-black section transition. The first
+time a stinger plays it is rendered normally and its partial movies are
+joined into media/stingers/<key>.mp4. Every later time the clip is spliced
+into the scene's list of partial movies instead of being animated again. The
+splice counts as many plays and frames as the original render, so progress
+(progress.py) and the render plan agree whether the clip was cached or not.
+
+The key covers the stinger's name and source, the resolution, frame rate and
+background, and the frame currently on screen: a transition fades over the
+pinned intro title, so it is the same clip for every section of a video (and
+for any video with the same title), but not across different titles.
+
+Register a stinger with register_stinger(name, play) and play it with
+play_stinger(scene, name), e.g. a channel intro before show_intro.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+from manim import config
+
+import render_metrics
+
+STINGER_DIR = os.path.join("media", "stingers")
+
+_stingers = {}
+
+
+def register_stinger(name: str, play) -> None:
+    """Registers play(scene) under name. play must leave the scene's mobjects unchanged."""
+    _stingers[name] = play
+
+
+def stinger_key(scene, name: str) -> str:
+    renderer = scene.renderer
+    renderer.update_frame(scene)
+    backdrop = hashlib.sha256(renderer.get_frame().tobytes()).hexdigest()
+    payload = {
+        "name": name,
+        "source": inspect.getsource(_stingers[name]),
+        "pixel_width": config.pixel_width,
+        "pixel_height": config.pixel_height,
+        "frame_rate": config.frame_rate,
+        "background_color": str(config.background_color),
+        "extension": config.movie_file_extension,
+        "backdrop": backdrop,
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def splice_clip(scene, clip_path: str, duration: float, plays: int = 1, frames: int | None = None) -> None:
+    """Adds a finished clip to the scene's movie as if its plays had just been played."""
+    renderer = scene.renderer
+    file_writer = renderer.file_writer
+    # Keep partial_movie_files indexed by num_plays, the way renderer.play
+    # does: the clip, then None (ignored when combining) for the other plays
+    for movie in [clip_path] + [None] * (plays - 1):
+        file_writer.partial_movie_files.append(movie)
+        file_writer.sections[-1].partial_movie_files.append(movie)
+        renderer.animations_hashes.append(None)
+    renderer.num_plays += plays
+    renderer.time += duration
+    if hasattr(file_writer, "add_spliced_frames"):
+        file_writer.add_spliced_frames(frames if frames is not None else round(duration * config.frame_rate))
+
+
+def play_stinger(scene, name: str) -> None:
+    """Plays a registered stinger, from the stinger cache when it has been rendered before."""
+    play = _stingers[name]
+    renderer = scene.renderer
+    file_writer = renderer.file_writer
+    if config.dry_run or renderer.skip_animations or not hasattr(file_writer, "partial_movie_directory"):
+        play(scene)
+        return
+
+    key = stinger_key(scene, name)
+    clip_path = os.path.join(STINGER_DIR, f"{key}{config.movie_file_extension}")
+    info_path = os.path.join(STINGER_DIR, f"{key}.json")
+    if os.path.exists(clip_path) and os.path.exists(info_path):
+        with open(info_path, "r") as f:
+            info = json.load(f)
+        # Clips cached before plays were recorded are rendered (and cached) again
+        if "plays" in info:
+            splice_clip(scene, os.path.abspath(clip_path), info["duration"], info["plays"], info["frames"])
+            return
+
+    first_play = renderer.num_plays
+    start_time = scene.time
+    first_frame = render_metrics.totals().get("frames", 0)
+    play(scene)
+    partial_movies = file_writer.partial_movie_files[first_play:]
+    if not partial_movies or None in partial_movies:
+        # Some animation was skipped, nothing complete to cache
+        return
+
+    from section_cache import concat_movies
+
+    os.makedirs(STINGER_DIR, exist_ok=True)
+    temp_path = f"{clip_path}.{os.getpid()}.tmp{config.movie_file_extension}"
+    concat_movies(partial_movies, temp_path)
+    # Both files appear complete or not at all: concurrent renders read them as soon as they exist
+    info_temp_path = f"{info_path}.{os.getpid()}.tmp"
+    with open(info_temp_path, "w") as f:
+        json.dump(
+            {
+                "name": name,
+                "duration": scene.time - start_time,
+                "plays": renderer.num_plays - first_play,
+                "frames": int(render_metrics.totals().get("frames", 0) - first_frame),
+            },
+            f,
+        )
+    os.replace(info_temp_path, info_path)
+    os.replace(temp_path, clip_path)
+    print(f"Cached stinger '{name}' in {clip_path}")
@@ -0,0 +1,87 @@
+"""
+Transcodes a synthetic movie with renditions._transcode and decodes the result.
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from fractions import Fraction
+from unittest import mock
+
+import av
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import renditions  # noqa: E402
+
+SOURCE_FPS = 60
+SECONDS = 2
+# Stands in for manim's QUALITIES, which the test does not need manim for
+QUALITIES = {
+    "l": {"pixel_width": 160, "pixel_height": 90, "frame_rate": 15},
+    "m": {"pixel_width": 320, "pixel_height": 180, "frame_rate": 30},
+}
+
+
+def write_source(path: str, audio: bool) -> None:
+    with av.open(path, mode="w") as container:
+        video = container.add_stream("libx264", rate=SOURCE_FPS)
+        video.width, video.height, video.pix_fmt = 640, 360, "yuv420p"
+        sound = container.add_stream("aac", rate=48000) if audio else None
+        for index in range(SOURCE_FPS * SECONDS):
+            image = np.full((360, 640, 3), index % 256, dtype=np.uint8)
+            frame = av.VideoFrame.from_ndarray(image, format="rgb24")
+            frame.pts, frame.time_base = index, Fraction(1, SOURCE_FPS)
+            for packet in video.encode(frame):
+                container.mux(packet)
+        for packet in video.encode(None):
+            container.mux(packet)
+        if sound:
+            for index in range(48000 * SECONDS // 1024):
+                samples = av.AudioFrame.from_ndarray(np.zeros((1, 1024), dtype=np.float32), format="fltp", layout="mono")
+                samples.sample_rate, samples.pts = 48000, index * 1024
+                for packet in sound.encode(samples):
+                    container.mux(packet)
+            for packet in sound.encode(None):
+                container.mux(packet)
+
+
+def decode(path: str) -> tuple[int, float]:
+    """Frame count and the time of the last frame plus one frame duration."""
+    with av.open(path) as container:
+        stream = container.streams.video[0]
+        times = [frame.time for frame in container.decode(stream)]
+        return len(times), times[-1] + 1 / float(stream.average_rate)
+
+
+class TranscodeTest(unittest.TestCase):
+    def transcode(self, audio: bool) -> dict:
+        workspace = tempfile.TemporaryDirectory()
+        self.addCleanup(workspace.cleanup)
+        directory = workspace.name
+        source = os.path.join(directory, "source.mp4")
+        write_source(source, audio)
+        targets = {quality: os.path.join(directory, f"{quality}.mp4") for quality in QUALITIES}
+        with mock.patch.object(renditions, "quality_settings", lambda quality: QUALITIES[quality[-1]]):
+            return renditions._transcode(source, targets, threads=1)
+
+    def check(self, videos: dict) -> None:
+        for quality, path in videos.items():
+            frame_rate = QUALITIES[quality]["frame_rate"]
+            frames, duration = decode(path)
+            self.assertEqual(frames, frame_rate * SECONDS, quality)
+            self.assertAlmostEqual(duration, SECONDS, delta=1 / frame_rate, msg=quality)
+
+    def test_with_audio(self):
+        self.check(self.transcode(audio=True))
+
+    def test_without_audio(self):
+        self.check(self.transcode(audio=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
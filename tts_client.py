@@ -0,0 +1,145 @@
+"""
+Long-lived edge-tts client shared by every voiceover in a process.
+
+generate_voice used to call asyncio.run per utterance: a new event loop, a
+new aiohttp session and connector, DNS lookup and TLS setup every time.
+TTSClient instead runs one event loop in a background thread for the life
+of the process, with one aiohttp connector (connection limit, DNS cache)
+that every request shares. Each edge-tts synthesis is still its own
+websocket, which is how the service works.
+
+Audio is written to disk chunk by chunk as it streams in. The clip's
+duration comes from the stream itself (the byte count of the constant
+48 kbit/s MP3 edge-tts sends) and so do per-word timings (its WordBoundary
+events), so nobody has to probe the file afterwards.
+
+    client = get_tts_client()
+    client.run(client.synthesize(text, "out.mp3", voice))          # from sync code
+    client.run(client.synthesize_many([(text, path, voice), ...]))  # a batch
+
+synthesize() returns {"duration": seconds, "words": [{"word", "start", "end"}, ...]}.
+
+At most MAX_CONCURRENCY syntheses are in flight at once across all callers,
+and a request that fails with a network or service error is retried up to
+MAX_ATTEMPTS times with exponential backoff and jitter.
+"""
+
+import asyncio
+import atexit
+import os
+import random
+import threading
+
+import aiohttp
+import edge_tts
+from edge_tts.exceptions import EdgeTTSException
+
+MAX_CONCURRENCY = 8
+# edge-tts always sends audio-24khz-48kbitrate-mono-mp3
+AUDIO_BYTES_PER_SECOND = 48000 / 8
+# WordBoundary offsets and durations are in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 0.5
+# Errors worth another attempt; anything else (e.g. a bad voice name) fails at once
+RETRYABLE = (EdgeTTSException, aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class SharedConnector(aiohttp.TCPConnector):
+    """A connector that outlives the sessions using it: edge-tts closes its session after every request."""
+
+    async def close(self):
+        pass
+
+    async def close_for_real(self):
+        await super().close()
+
+
+class TTSClient:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, max_attempts: int = MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="tts-client", daemon=True)
+        self.thread.start()
+        self.semaphore = None
+        self.connector = None
+        self.run(self._start(max_concurrency))
+
+    async def _start(self, max_concurrency: int) -> None:
+        # Both belong to the client's loop, so they are created on it
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.connector = SharedConnector(limit=max_concurrency, ttl_dns_cache=300)
+
+    def run(self, coroutine):
+        """Runs a coroutine on the client's loop and waits for its result, from any thread."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def synthesize(self, text: str, output_file: str, voice: str, **params) -> dict:
+        """
+        Streams the speech for text into output_file, retrying transient
+        failures. Returns its duration and word timings.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            async with self.semaphore:
+                try:
+                    return await self._stream(text, output_file, voice, **params)
+                except RETRYABLE as e:
+                    if attempt == self.max_attempts:
+                        raise
+                    error = e
+            delay = BACKOFF_SECONDS * 2 ** (attempt - 1) * (1 + random.random())
+            print(f"TTS request failed ({error!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _stream(self, text: str, output_file: str, voice: str, **params) -> dict:
+        communicate = edge_tts.Communicate(text, voice, boundary="WordBoundary", connector=self.connector, **params)
+        size = 0
+        words = []
+        with open(output_file, "wb") as f:
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    f.write(chunk["data"])
+                    size += len(chunk["data"])
+                elif chunk["type"] == "WordBoundary":
+                    start = chunk["offset"] / TICKS_PER_SECOND
+                    words.append(
+                        {
+                            "word": chunk["text"],
+                            "start": round(start, 3),
+                            "end": round(start + chunk["duration"] / TICKS_PER_SECOND, 3),
+                        }
+                    )
+        return {"duration": size / AUDIO_BYTES_PER_SECOND, "words": words}
+
+    async def synthesize_many(self, requests: list, **params) -> list:
+        """
+        Synthesizes (text, output_file, voice) requests concurrently. Returns
+        one entry per request, in order: synthesize()'s result, or the exception.
+        """
+        return await asyncio.gather(
+            *(self.synthesize(text, output_file, voice, **params) for text, output_file, voice in requests),
+            return_exceptions=True,
+        )
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        self.run(self.connector.close_for_real())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def get_tts_client() -> TTSClient:
+    """The process' client, started on first use."""
+    global _client
+    with _client_lock:
+        # A forked child cannot use its parent's loop thread
+        if _client is None or _client.pid != os.getpid():
+            _client = TTSClient()
+            atexit.register(_client.close)
+        return _client
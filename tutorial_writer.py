@@ -0,0 +1,117 @@
+"""
+File writer used by main.Video.
+
+Static holds: most of a tutorial is self.wait(...) while the narration
+plays, and manim hands such a frozen wait to the file writer as one frame
+repeated for every frame of the wait. With MANIM_STATIC_HOLDS=1 the writer
+encodes that frame once at the start of the hold and once at its last
+timestamp instead of encoding every copy. Players show the first frame
+until the next one, so the video looks and lasts exactly the same while the
+frames written during narration drop to two per hold.
+
+Pre-mixed narration: with MANIM_PREMIX_NARRATION=1, main.Video hands its
+voiceovers to the writer as cues instead of calling manim's add_sound. The
+movie is combined without sound and the narration is mixed in one streaming
+pass (narration_track.py) and muxed on by stream copy, so memory does not
+grow with the length of the video.
+
+Encoder threads: when MANIM_ENCODER_THREADS is set (by jobs holding a
+scheduler.py lease), libx264 uses that many threads instead of every core.
+"""
+
+import os
+import time
+
+import av
+from manim import config
+from manim.scene.scene_file_writer import SceneFileWriter
+
+import render_metrics
+from narration_track import build_narration_track, mux_audio
+from scheduler import ENCODER_THREADS_ENV
+
+# How often the frame count is written to the metrics file while rendering
+PROGRESS_SECONDS = 1.0
+
+
+def static_holds_enabled() -> bool:
+    return os.environ.get("MANIM_STATIC_HOLDS", "0") == "1"
+
+
+def premix_narration_enabled() -> bool:
+    # AAC can only be muxed into mp4 movies
+    return (
+        os.environ.get("MANIM_PREMIX_NARRATION", "0") == "1"
+        and config.movie_file_extension == ".mp4"
+        and config.format != "gif"
+    )
+
+
+class TutorialFileWriter(SceneFileWriter):
+    def __init__(self, renderer, scene_name, **kwargs):
+        self.static_holds = static_holds_enabled()
+        self.premix_narration = premix_narration_enabled()
+        self.narration_cues = []
+        self.next_pts = 0
+        self.last_progress = 0.0
+        super().__init__(renderer, scene_name, **kwargs)
+
+    def add_narration_cue(self, sound_file: str, time: float, gain: float | None = None) -> None:
+        self.narration_cues.append((time, str(sound_file), gain))
+
+    def combine_to_movie(self):
+        started = time.perf_counter()
+        super().combine_to_movie()
+        if self.premix_narration and self.movie_file_path.exists():
+            track_path = self.movie_file_path.with_suffix(".narration.m4a")
+            build_narration_track(self.narration_cues, self.renderer.time, str(track_path))
+            mux_audio(str(self.movie_file_path), str(track_path))
+            track_path.unlink()
+        render_metrics.record(
+            "combine",
+            seconds=time.perf_counter() - started,
+            partial_movies=len(self.partial_movie_files),
+            premixed=self.premix_narration,
+        )
+
+    def open_partial_movie_stream(self, file_path=None) -> None:
+        # Timestamps are set explicitly, starting over in every partial movie
+        self.next_pts = 0
+        super().open_partial_movie_stream(file_path=file_path)
+        threads = os.environ.get(ENCODER_THREADS_ENV)
+        if threads:
+            # Set before the first frame opens the encoder (scheduler.py budget)
+            self.video_stream.thread_count = int(threads)
+
+    def _encode(self, frame, pts: int) -> None:
+        av_frame = av.VideoFrame.from_ndarray(frame, format="rgba")
+        av_frame.pts = pts
+        for packet in self.video_stream.encode(av_frame):
+            self.video_container.mux(packet)
+
+    def encode_and_write_frame(self, frame, num_frames: int) -> None:
+        started = time.perf_counter()
+        if self.static_holds and num_frames > 2:
+            # A held frame: show it at the start and repeat it at the last
+            # timestamp so the segment keeps its full duration
+            self._encode(frame, self.next_pts)
+            self._encode(frame, self.next_pts + num_frames - 1)
+        else:
+            for offset in range(num_frames):
+                self._encode(frame, self.next_pts + offset)
+        self.next_pts += num_frames
+        render_metrics.add("encode_seconds", time.perf_counter() - started)
+        render_metrics.add("frames", num_frames)
+        self.record_progress(started)
+
+    def add_spliced_frames(self, num_frames: int) -> None:
+        """Counts the frames of a clip spliced in without encoding (stingers.py)."""
+        render_metrics.add("spliced_frames", num_frames)
+        self.record_progress(time.perf_counter(), force=True)
+
+    def record_progress(self, now: float, force: bool = False) -> None:
+        if force or now - self.last_progress >= PROGRESS_SECONDS:
+            # Frames so far, encoded or spliced, for progress.py to follow the render live
+            totals = render_metrics.totals()
+            render_metrics.record("progress", frames=int(totals.get("frames", 0) + totals.get("spliced_frames", 0)))
+            self.last_progress = now
@@ -0,0 +1,145 @@
+"""
+Content-addressed cache for generated voiceovers.
+
+Clips are stored as <key>.mp3 where the key hashes the text, the voice and
+the TTS parameters, so the same line is only synthesized once. An SQLite
+index next to the clips keeps each clip's duration (no need to re-probe the
+MP3) and when it was last used. When the cache grows past its disk budget the
+least recently used clips are evicted. Word timings of a clip, when the
+TTS backend provides them, are kept next to it as <key>.words.json.
+
+The index is opened with a busy timeout in WAL mode and clips are written to
+a temporary file and renamed into place, so several renders can share the
+cache at the same time.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+DEFAULT_MAX_BYTES = int(os.environ.get("VOICE_CACHE_MAX_MB", "1024")) * 1024 * 1024
+# Clips used this recently are never evicted, a running render may still need them
+EVICTION_GRACE_SECONDS = 3600
+
+
+def voice_key(text: str, voice: str, **params) -> str:
+    """Deterministic key of a clip: same text, voice and parameters -> same key."""
+    payload = json.dumps({"text": text, "voice": voice, "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class VoiceCache:
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.index_path = os.path.join(self.directory, "index.sqlite")
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS clips (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    voice TEXT NOT NULL,
+                    duration REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS clips_last_used ON clips (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def words_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.words.json")
+
+    def temp_path(self, key: str) -> str:
+        """A private path to write a clip to before put() moves it into place."""
+        return os.path.join(self.directory, f"{key}.{os.getpid()}.{time.monotonic_ns()}.part")
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        """Returns (path, duration) of a cached clip and marks it as used, or None."""
+        path = self.path(key)
+        with self._connect() as db:
+            row = db.execute("SELECT duration FROM clips WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(path):
+                db.execute("DELETE FROM clips WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE clips SET last_used = ? WHERE key = ?", (time.time(), key))
+        return path, row[0]
+
+    def peek(self, key: str) -> float | None:
+        """Returns the duration of a cached clip without touching it, or None."""
+        with self._connect() as db:
+            row = db.execute("SELECT duration FROM clips WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def words(self, key: str) -> list | None:
+        """Word timings ([{"word", "start", "end"}, ...]) stored with a clip, or None."""
+        try:
+            with open(self.words_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, temp_path: str, text: str, voice: str, duration: float, words: list | None = None) -> str:
+        """Moves a freshly generated clip (and its word timings) into the cache and records it."""
+        path = self.path(key)
+        if words is not None:
+            words_temp = f"{temp_path}.words"
+            with open(words_temp, "w", encoding="utf-8") as f:
+                json.dump(words, f, ensure_ascii=False)
+            os.replace(words_temp, self.words_path(key))
+        os.replace(temp_path, path)
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO clips (key, text, voice, duration, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, text, voice, duration, os.path.getsize(path), now, now),
+            )
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        """Deletes least recently used clips until the cache fits its budget. Returns bytes freed."""
+        freed = 0
+        cutoff = time.time() - EVICTION_GRACE_SECONDS
+        with self._connect() as db:
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = db.execute(
+                "SELECT key, size FROM clips WHERE last_used < ? ORDER BY last_used", (cutoff,)
+            ).fetchall()
+            for key, size in rows:
+                if total - freed <= self.max_bytes:
+                    break
+                for stale in (self.path(key), self.words_path(key)):
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
+                db.execute("DELETE FROM clips WHERE key = ?", (key,))
+                freed += size
+        if freed:
+            print(f"Voice cache: evicted {freed / 1024 / 1024:.1f} MB")
+        return freed
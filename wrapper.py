@@ -1,86 +1,276 @@
 import subprocess
 import datetime
-import json
 import os
-import glob
+import shutil
+import socket
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from job_store import QUEUED, get_job_store, render_key, script_hash
+from render_metrics import METRICS_FILE_ENV, metrics_file_for, print_summary, summarize
+from scheduler import BATCH, ENCODER_THREADS_ENV, acquire
 
-def run_manim_foreground():
+# Media directory of every running job, so parallel renders never share partial movie files
+JOBS_MEDIA_DIR = os.path.join("media", "jobs")
+# Rough peak memory of one low/medium quality render (see benchmark.py)
+MEMORY_PER_JOB_MB = 1500
+# How often a cancellable render checks its cancel event
+CANCEL_POLL_SECONDS = 0.5
+
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo, or None where that does not exist."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def default_jobs():
+    """As many parallel renders as there are CPUs, and memory for."""
+    jobs = os.cpu_count() or 1
+    memory = available_memory_mb()
+    if memory is not None:
+        jobs = min(jobs, memory // MEMORY_PER_JOB_MB)
+    return max(jobs, 1)
+
+
+def job_paths(script_file, quality="l"):
+    """Log, metrics file, media directory and video paths of one render of script_file."""
+    from section_cache import VIDEO_DIR, quality_settings
+
+    # Generate a timestamp and a script-specific filename
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    script_name = os.path.splitext(os.path.basename(script_file))[0]
+    video_filename = f"{script_name}.mp4"
+    log_filename = os.path.join("logs", f"manim_log_{script_name}_{timestamp}.txt")
+    media_dir = os.path.join(JOBS_MEDIA_DIR, f"{script_name}_{timestamp}")
+
+    settings = quality_settings(quality)
+    resolution = f"{settings['pixel_height']}p{settings['frame_rate']}"
+    return {
+        "name": script_name,
+        "video_filename": video_filename,
+        "log": log_filename,
+        "metrics": metrics_file_for(log_filename),
+        "media_dir": media_dir,
+        "job_video": os.path.join(media_dir, "videos", "main", resolution, video_filename),
+        "video": os.path.join(VIDEO_DIR, resolution, video_filename),
+    }
+
+
+def collect_video(paths):
+    """Moves a finished job's video to where a plain `manim` run would put it and drops its media directory."""
+    os.makedirs(os.path.dirname(paths["video"]), exist_ok=True)
+    shutil.move(paths["job_video"], paths["video"])
+    # Partial movies, texts and tex files are only useful while rendering
+    shutil.rmtree(paths["media_dir"], ignore_errors=True)
+
+
+def render_job(script_file, quality="l", priority=BATCH, cancel=None, paths=None):
+    """
+    Renders one script in a `manim` process with its own media directory,
+    log and metrics file, then moves the video to where a plain `manim` run
+    would put it. The render waits for a scheduler.py lease at priority.
+
+    Setting the cancel event stops the render. paths are the job_paths() of
+    this render, for callers that need the log before it finishes.
+
+    Returns (succeeded, video path, log path).
+    """
+    paths = paths or job_paths(script_file, quality)
+
+    # Construct the Manim command
+    command = [
+        "manim",
+        f"-q{quality}",
+        "main.py",
+        "Video",
+        "-o",
+        paths["video_filename"],
+        "--media_dir",
+        paths["media_dir"],
+    ]
+    os.makedirs("logs", exist_ok=True)
+    with acquire("manim", priority, script_file) as lease:
+        env = {
+            **os.environ,
+            "MANIM_SCRIPT_FILE": script_file,
+            METRICS_FILE_ENV: paths["metrics"],
+            ENCODER_THREADS_ENV: str(lease.threads),
+        }
+        print(f"Starting {script_file} -> {paths['video']} (log: {paths['log']})")
+        with open(paths["log"], "w", encoding="utf-8") as log_file:
+            returncode = None
+            if not (cancel and cancel.is_set()):
+                process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, text=True, env=env)
+                returncode = wait_for(process, cancel)
+
+    succeeded = returncode == 0 and os.path.exists(paths["job_video"])
+    if succeeded:
+        collect_video(paths)
+    elif cancel and cancel.is_set():
+        shutil.rmtree(paths["media_dir"], ignore_errors=True)
+    return succeeded, paths["video"], paths["log"]
+
+
+def wait_for(process, cancel=None):
+    """Waits for a process, terminating it if the cancel event is set. Returns its exit code."""
+    if cancel is None:
+        return process.wait()
+    while True:
+        try:
+            return process.wait(timeout=CANCEL_POLL_SECONDS)
+        except subprocess.TimeoutExpired:
+            if cancel.is_set():
+                process.terminate()
+
+
+def copy_video(source, destination):
     """
-    Runs the Manim command in the foreground for each JSON script in the scripts folder.
+    Gives a deduplicated job its own copy of an identical script's video, so
+    re-rendering that script after an edit cannot change this job's output.
+    Not a hard link: a plain manim run rewrites its video in place.
     """
-    all_script_files = glob.glob(os.path.join("scripts", "*.json"))
+    if os.path.abspath(source) == os.path.abspath(destination):
+        return destination
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temp_path = f"{destination}.{os.getpid()}.tmp"
+    shutil.copyfile(source, temp_path)
+    os.replace(temp_path, destination)
+    return destination
 
-    done_file = os.path.join("scripts", "done.txt")
-    processed_files = []
-    if os.path.exists(done_file):
-        with open(done_file, 'r') as f:
-            processed_files = [os.path.join("scripts", line.strip()) for line in f.readlines()]
 
-    # Normalize paths for comparison
-    processed_files = [os.path.normpath(p) for p in processed_files]
-    all_script_files = [os.path.normpath(p) for p in all_script_files]
+def process_job(store, job, quality="l", render=render_job):
+    """
+    Renders a claimed job with render (render_job, or a warm worker pool's
+    render) and records the outcome in the store. Returns its metrics file, if any.
+    """
+    script_file = job["script"]
+    try:
+        content_hash = script_hash(script_file)
+    except (OSError, ValueError) as e:
+        # Deleted or broken since it was queued (JSON and decode errors are
+        # ValueErrors); retrying cannot help, saving it again queues it again
+        print(f"Cannot read {script_file}, skipping it: {e}")
+        store.fail(job["id"], f"cannot read script: {e}", max_attempts=0)
+        return None
+    key = render_key(content_hash, quality)
+    existing = store.find_output(key)
+    if existing:
+        # Same content and settings as a finished job, nothing to render
+        try:
+            video_path = copy_video(existing, job_paths(script_file, quality)["video"])
+        except OSError as e:
+            print(f"Could not copy {existing} for {script_file}: {e}")
+            store.fail(job["id"], str(e))
+            return None
+        store.finish(job["id"], video_path, None, key, content_hash)
+        print(f"{script_file} is identical to an already rendered script: {existing}")
+        return None
+    try:
+        succeeded, video_path, log_filename = render(script_file, quality)
+    except FileNotFoundError:
+        # Leave the job for a run where manim is installed
+        store.requeue(script_file)
+        raise
+    except Exception as e:
+        print(f"An error occurred while running Manim for {script_file}: {e}")
+        store.fail(job["id"], str(e))
+        return None
+
+    if succeeded:
+        store.finish(job["id"], video_path, log_filename, key, content_hash)
+        print(f"Manim rendering for {script_file} completed successfully: {video_path}")
+    else:
+        state = store.fail(job["id"], "manim exited with an error", log_filename)
+        retry = " Queued for another attempt." if state == QUEUED else ""
+        print(f"Manim rendering for {script_file} failed. See {log_filename} for details.{retry}")
+
+    metrics_filename = metrics_file_for(log_filename)
+    return metrics_filename if os.path.exists(metrics_filename) else None
+
 
-    script_files = sorted([f for f in all_script_files if f not in processed_files])
-    
-    if not script_files:
+def worker_name(index):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def run_worker(store, worker, quality="l", render=render_job):
+    """Claims and renders queued jobs until the queue is empty. Returns the metrics files written."""
+    metrics_files = []
+    while True:
+        job = store.claim_next(worker)
+        if job is None:
+            return metrics_files
+        metrics_filename = process_job(store, job, quality, render)
+        if metrics_filename:
+            metrics_files.append(metrics_filename)
+
+
+def run_manim_batch(jobs=None, quality="l", warm=False):
+    """
+    Renders every queued script in the job store (new JSON scripts in the
+    scripts folder are queued first), jobs at a time. Each job reads its own
+    script through MANIM_SCRIPT_FILE, or with warm=True is rendered inside a
+    long-lived worker process (manim_worker.py).
+    """
+    store = get_job_store()
+    store.requeue_stale()
+    store.sync_scripts("scripts")
+    queued = len(store.jobs(QUEUED))
+    if not queued:
         print("No new JSON script files found to process.")
         return
 
-    for script_file in script_files:
-        print(f"--- Processing script: {script_file} ---")
+    jobs = min(jobs or default_jobs(), queued)
+    print(f"Rendering {queued} scripts, {jobs} at a time, at -q{quality}")
+
+    render = render_job
+    warm_pool = None
+    if warm:
+        from manim_worker import WarmWorkerPool
+
+        warm_pool = WarmWorkerPool(jobs)
+        render = warm_pool.render
+
+    metrics_files = []
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(run_worker, store, worker_name(index), quality, render)
+                for index in range(jobs)
+            ]
+            for future in as_completed(futures):
+                try:
+                    metrics_files.extend(future.result())
+                except FileNotFoundError:
+                    print("Error: 'manim' command not found. Make sure Manim is installed and in your PATH.")
+    finally:
+        if warm_pool:
+            warm_pool.shutdown()
+
+    if metrics_files:
+        print("--- Batch render metrics ---")
+        print_summary(summarize(metrics_files))
+
+
+def run_manim_foreground():
+    """
+    Runs the Manim command in the foreground for each queued script, one at a time.
+    """
+    run_manim_batch(jobs=1)
 
-        # Load the content of the script file and dump it into test.json
-        try:
-            with open(script_file, 'r') as f_in:
-                data = json.load(f_in)
-            with open('test.json', 'w') as f_out:
-                json.dump(data, f_out, indent=2)
-            print(f"Successfully dumped content from {script_file} to test.json")
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error processing {script_file}: {e}")
-            continue
-
-        # Generate a timestamp and a script-specific filename
-        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-        script_name = os.path.splitext(os.path.basename(script_file))[0]
-        video_filename = f"{script_name}.mp4"
-        log_filename = os.path.join("logs", f"manim_log_{script_name}_{timestamp}.txt")
-
-        # Construct the Manim command
-        command = [
-            "manim",
-            "-ql",
-            "main.py",
-            "Video",
-            "-o",
-            video_filename,
-        ]
-
-        # Run the command in the foreground
-        print(f"Starting Manim rendering...")
-        print(f"Output file: {video_filename}")
-        print(f"Log file: {log_filename}")
-        print(f"Command: {' '.join(command)}")
-        
-        try:
-            with open(log_filename, "w", encoding="utf-8") as log_file:
-                result = subprocess.run(command, stdout=log_file, stderr=subprocess.STDOUT, text=True, check=False)
-            
-            if result.returncode == 0:
-                print(f"Manim rendering for {script_file} completed successfully.")
-            else:
-                print(f"Manim rendering for {script_file} failed. See {log_filename} for details.")
-        except FileNotFoundError:
-            print("Error: 'manim' command not found. Make sure Manim is installed and in your PATH.")
-            break # Stop processing if manim is not found
-        except Exception as e:
-            print(f"An error occurred while running Manim: {e}")
-
-        # Add the processed file to done.txt
-        with open(done_file, 'a') as f:
-            f.write(os.path.basename(script_file) + '\n')
-        
-        print("-" * 50 + "\n")
 
 if __name__ == "__main__":
-    run_manim_foreground()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render every queued script (new scripts in scripts/ are queued).")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=0, help="Parallel renders (default: as many as CPU and memory allow)"
+    )
+    parser.add_argument("-q", "--quality", default="l", help="Quality flag: l, m or h")
+    parser.add_argument("--warm", action="store_true", help="Render in long-lived worker processes instead of one manim per script")
+    args = parser.parse_args()
+    run_manim_batch(args.jobs or None, args.quality[-1], args.warm)